@@ -1,66 +1,123 @@
 import os
+import io
+import json
+import hashlib
 import streamlit as st
-from groq import Groq
-import pandas as pd
+from indice_contas import IndiceContas
+from nucleo_chat import MODELO, ClienteSobDemanda, executar_chat
+from recursos import PASTA_CACHE, obter_sessao_http
+from historico_chat import estimar_tokens
+from categorizador import (
+    CacheCategorias, LimitadorTaxa, categorizar_em_lotes, interpretar_resposta_lote, montar_pedido_lote,
+)
 
 # Set the API key as an environment variable
 os.environ["GROQ_API_KEY"] = "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"  # Replace with your Groq API key
 
-# Inicializar o cliente da API
-client = Groq()  # O cliente pegará automaticamente a chave de API
+# Cliente da API, criado uma única vez por processo, na primeira chamada ao modelo
+client = ClienteSobDemanda()
+
+# Cache do plano de contas: tempo de validade em memória e cópia em disco usada como reserva
+TTL_PLANO_DE_CONTAS = 600  # segundos
+TIMEOUT_PLANO_DE_CONTAS = 5  # segundos
+ARQUIVO_PLANO_CSV = PASTA_CACHE / "plano_de_contas.csv"
+ARQUIVO_PLANO_META = PASTA_CACHE / "plano_de_contas.json"
+ARQUIVO_CACHE_CATEGORIAS = PASTA_CACHE / "categorias.json"
+
+# Função para baixar o CSV do plano de contas, revalidando a cópia em disco com ETag/Last-Modified
+def baixar_plano_de_contas_csv(link_csv):
+    import requests
+
+    meta = {}
+    if ARQUIVO_PLANO_META.exists():
+        try:
+            meta = json.loads(ARQUIVO_PLANO_META.read_text(encoding="utf-8"))
+        except ValueError:
+            meta = {}
+
+    headers = {}
+    if ARQUIVO_PLANO_CSV.exists() and meta.get("link") == link_csv:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        res = obter_sessao_http().get(link_csv, headers=headers, timeout=TIMEOUT_PLANO_DE_CONTAS)
+        if res.status_code == 304:
+            return ARQUIVO_PLANO_CSV.read_bytes()
+        res.raise_for_status()
+    except requests.RequestException:
+        # Google Sheets lento ou fora do ar: usa a última cópia salva em disco
+        if ARQUIVO_PLANO_CSV.exists():
+            return ARQUIVO_PLANO_CSV.read_bytes()
+        raise
+
+    try:
+        PASTA_CACHE.mkdir(parents=True, exist_ok=True)
+        ARQUIVO_PLANO_CSV.write_bytes(res.content)
+        ARQUIVO_PLANO_META.write_text(json.dumps({
+            "link": link_csv,
+            "etag": res.headers.get("ETag"),
+            "last_modified": res.headers.get("Last-Modified"),
+        }), encoding="utf-8")
+    except OSError:
+        pass  # Sem permissão de escrita: segue apenas com o cache em memória
+    return res.content
 
 # Função para carregar o plano de contas a partir do Google Sheets
+# Fica em cache entre os reruns do Streamlit; a rede só é consultada após o TTL expirar
+@st.cache_data(ttl=TTL_PLANO_DE_CONTAS, show_spinner=False)
 def carregar_plano_de_contas_google(link_csv):
-    # Ler a planilha diretamente do Google Sheets
-    df = pd.read_csv(link_csv)
-
-    # Criar um dicionário estruturado a partir das colunas Categoria, Descrição e DRE
-    plano_de_contas = {}
-    for _, row in df.iterrows():
-        categoria = row['Categoria']
-        descricao = row['Descrição']
-        dre = row['DRE']
-
-        # Montar a estrutura hierárquica com a categoria e descrição
-        if categoria not in plano_de_contas:
-            plano_de_contas[categoria] = []
-        
-        # Adicionar a descrição e o DRE correspondente
-        plano_de_contas[categoria].append((descricao, dre))
+    import pandas as pd
+
+    # Ler a planilha do Google Sheets (ou da cópia em disco)
+    df = pd.read_csv(io.BytesIO(baixar_plano_de_contas_csv(link_csv)))
+
+    # Criar um dicionário estruturado a partir das colunas Categoria, Descrição e DRE,
+    # agrupando por categoria na ordem em que aparecem na planilha
+    plano_de_contas = {
+        categoria: list(zip(grupo['Descrição'], grupo['DRE']))
+        for categoria, grupo in df.groupby('Categoria', sort=False, dropna=False)
+    }
 
     return plano_de_contas
 
-#Função para formatar o plano de contas para o conteúdo de preferências com limitação
-def formatar_plano_de_contas(plano, max_contas=91):
-    conteudo = ""
+#Função para formatar o plano de contas para o conteúdo de preferências (com limitação opcional)
+def formatar_plano_de_contas(plano, max_contas=None):
+    partes = []
     contas_processadas = 0
     
     # Iterar pelas categorias no plano de contas
     for categoria, contas in plano.items():
-        conteudo += f"**Categoria: {categoria}**\n"
+        partes.append(f"**Categoria: {categoria}**\n")
         
         # Iterar pelas contas dentro de uma categoria
         for descricao, dre in contas:
             # Cada conta é formatada com o código DRE e descrição, com base na categoria
-            conteudo += f"  - **{dre}**: {descricao} (Aceita lançamento)\n"
+            partes.append(f"  - **{dre}**: {descricao} (Aceita lançamento)\n")
             contas_processadas += 1
             
             # Limitar o número de contas processadas
-            if contas_processadas >= max_contas:
+            if max_contas and contas_processadas >= max_contas:
                 break
         
         # Parar de processar mais categorias após o limite
-        if contas_processadas >= max_contas:
+        if max_contas and contas_processadas >= max_contas:
             break
             
-    return conteudo
+    return "".join(partes)
 
-# URL para exportação CSV do Google Sheets
-link_google_sheet_csv = 'https://docs.google.com/spreadsheets/d/1S0DMufjJo-4rEOpdCmoDrTuAIl3THcz6iiWPpro3ySc/export?format=csv'
-plano_de_contas = carregar_plano_de_contas_google(link_google_sheet_csv)
+# Função para identificar a versão do plano de contas pelo hash do seu conteúdo
+def hash_plano_de_contas(plano):
+    conteudo = json.dumps(list(plano.items()), ensure_ascii=False, default=str)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
 
-# Geração das preferências de conteúdo usando o plano de contas formatado
-preferencias_conteudo = f"""
+# Nome do usuário atendido (defina o nome do usuário ou passe dinamicamente, se preferir)
+USUARIO_NOME = "Nome do Usuário"
+
+# Instruções fixas das preferências de conteúdo; o plano de contas formatado é acrescentado ao final
+INSTRUCOES_FINANCEIRO = """
 Função: Você atuará como especialista financeiro com foco na conciliação de contas bancárias, auxiliando na categorização de transações.
 
 Regras e Diretrizes:
@@ -80,83 +137,179 @@ Validação e Confirmação:
 
 Oriente o usuário a utilizar sempre uma categoria existente da coluna categoria, informando o nome dela completo. Se a categoria ideal não estiver clara, explique o motivo da escolha e reafirme que a sugestão é a mais adequada conforme o contexto fornecido.
 
-Plano de Contas:
-{formatar_plano_de_contas(plano_de_contas)}
+Plano de Contas (contas candidatas mais relevantes para a pergunta):
 """
 
-# Inicializar o histórico e outros estados de sessão, se necessário
-if "historico" not in st.session_state:
-    st.session_state.historico = []
-if 'input' not in st.session_state:
-    st.session_state.input = ''
-if 'ultima_resposta' not in st.session_state:
-    st.session_state.ultima_resposta = ''
-
-# Função para enviar a pergunta e receber a resposta
-def send_question(question):
-    usuario_nome = "Nome do Usuário"  # Defina o nome do usuário ou passe dinamicamente, se preferir
-    
-    # Adicionar a pergunta do usuário ao histórico
-    st.session_state.historico.append({"role": "user", "content": question})
-    
-    # Criar uma mensagem de contexto com as preferências e o nome do usuário
-    mensagens = [{"role": "system", "content": f"Você está atendendo o usuário {usuario_nome}. Considere as seguintes preferências: {preferencias_conteudo}."}]
-    mensagens.extend(st.session_state.historico)  # Adiciona o histórico de mensagens anterior
+# Quantidade de contas candidatas enviadas ao modelo em cada pergunta
+TOP_K_CONTAS = 20
+
+# Função para montar a parte fixa do prompt do sistema (preferências e instruções)
+# Não depende do plano de contas (as contas candidatas entram em cada pergunta), por isso não tem cache:
+# é só a junção de duas strings
+def montar_prompt_sistema(usuario_nome):
+    return "".join([
+        f"Você está atendendo o usuário {usuario_nome}. Considere as seguintes preferências: ",
+        INSTRUCOES_FINANCEIRO,
+    ])
 
-    # Chamar a API da IA com o histórico e contexto personalizado
-    chat_completion = client.chat.completions.create(
-        messages=mensagens,
-        model="llama3-groq-70b-8192-tool-use-preview",
-    )
+# Função para construir o índice de busca, uma única vez por versão do plano de contas
+# O argumento `_plano` não entra na chave do cache: a versão (hash) já identifica o conteúdo
+@st.cache_resource(show_spinner=False)
+def construir_indice_contas(versao_plano, _plano):
+    return IndiceContas(_plano)
 
-    # Obter a resposta da IA e armazenar no histórico e em `ultima_resposta`
-    resposta = chat_completion.choices[0].message.content
-    st.session_state.historico.append({"role": "assistant", "content": resposta})
-    st.session_state.ultima_resposta = resposta  # Armazena a última resposta para exibição direta
+# Função para montar o prompt completo de uma pergunta, com apenas as contas candidatas mais relevantes
+def montar_prompt_pergunta(pergunta, k=TOP_K_CONTAS):
+    contas_candidatas = formatar_plano_de_contas(indice_contas.subplano(pergunta, k))
+    return "".join([prompt_sistema, contas_candidatas, "\n."])
 
 # Configuração da interface do Streamlit
+# O título aparece antes de carregar o plano de contas (e o pandas), que só acontece depois
 st.set_page_config(page_title="Chat com IA", layout="wide")
 st.title("Chat Financeiro LocalRental - Conciliação Bancaria")
 
-# Campo de entrada e botão de envio
-col1, col2 = st.columns([4, 1])  # Criar duas colunas: uma para o campo e outra para o botão
-
-# Campo de entrada
-with col1:
-    pergunta = st.text_input("Digite sua pergunta:", 
-                             value=st.session_state.input,
-                             placeholder="Escreva sua mensagem aqui...", 
-                             label_visibility="collapsed")
-
-# Botão de envio
-with col2:
-    if st.button("Enviar"):
-        if pergunta:  # Verificar se a pergunta não está vazia
-            send_question(pergunta)  # Obter a resposta da IA
-            st.session_state.input = ""  # Limpa o campo de entrada após enviar
-
-# Exibir a última resposta abaixo da área de entrada
-if 'ultima_resposta' in st.session_state and st.session_state.ultima_resposta:
-    st.write("### Resposta da IA")
-    st.markdown(f"<div style='text-align: left; background-color: #d4d4d4; padding: 5px; border-radius: 10px; margin: 2px 0; display: inline-block; max-width: 70%; color: black;'><b>IA:</b> {st.session_state.ultima_resposta}</div>", unsafe_allow_html=True)
-
-# Exibir o histórico de conversas completo abaixo da última resposta
-st.write("### Histórico Completo de Conversas")
-for mensagem in st.session_state.historico:
-    if mensagem["role"] == "user":
-        st.markdown(f"<div style='text-align: right; background-color: #e1ffc7; padding: 5px; border-radius: 10px; margin: 2px 0; display: inline-block; max-width: 70%; color: black;'><b>Você:</b> {mensagem['content']}</div>", unsafe_allow_html=True)
-    elif mensagem["role"] == "assistant":
-        st.markdown(f"<div style='text-align: left; background-color: #d4d4d4; padding: 5px; border-radius: 10px; margin: 2px 0; display: inline-block; max-width: 70%; color: black;'><b>IA:</b> {mensagem['content']}</div>", unsafe_allow_html=True)
-
-# Adiciona estilo opcional para melhorar a interface
-st.markdown("""
-<style>
-body {
-    background-color: #f0f0f0;  /* Fundo claro para dar um aspecto moderno */
-}
-div {
-    padding: 5px;  /* Reduz o espaço entre as mensagens */
-    border-radius: 10px;
-}
-</style>
-""", unsafe_allow_html=True)
+# URL para exportação CSV do Google Sheets
+link_google_sheet_csv = 'https://docs.google.com/spreadsheets/d/1S0DMufjJo-4rEOpdCmoDrTuAIl3THcz6iiWPpro3ySc/export?format=csv'
+plano_de_contas = carregar_plano_de_contas_google(link_google_sheet_csv)
+
+# Versão do plano de contas (identifica o índice de busca) e parte fixa do prompt do sistema
+versao_plano_de_contas = hash_plano_de_contas(plano_de_contas)
+prompt_sistema = montar_prompt_sistema(USUARIO_NOME)
+tokens_prompt_sistema = estimar_tokens(prompt_sistema)
+indice_contas = construir_indice_contas(versao_plano_de_contas, plano_de_contas)
+
+# Inicializar os estados de sessão da categorização em lote, se necessário
+if 'extrato_categorizado' not in st.session_state:
+    st.session_state.extrato_categorizado = None
+    st.session_state.metricas_lote = None
+
+# Configurações da categorização em lote
+TAMANHO_LOTE = 25  # descrições por requisição
+LOTES_EM_PARALELO = 4
+REQUISICOES_POR_MINUTO = 30
+CONTAS_POR_DESCRICAO_LOTE = 5  # contas candidatas por descrição enviadas no lote
+
+# Limitador de taxa compartilhado por todas as sessões do processo
+@st.cache_resource(show_spinner=False)
+def obter_limitador():
+    return LimitadorTaxa(REQUISICOES_POR_MINUTO)
+
+# Cache de categorias (regras confirmadas e respostas do modelo) compartilhado por todas as sessões
+@st.cache_resource(show_spinner=False)
+def obter_cache_categorias(versao_plano):
+    return CacheCategorias(ARQUIVO_CACHE_CATEGORIAS, versao_plano)
+
+# Função para categorizar um lote de descrições em uma única requisição ao modelo
+def enviar_lote_categorizacao(descricoes):
+    # Contas candidatas: união das mais relevantes para cada descrição do lote
+    candidatas = {}
+    for descricao in descricoes:
+        for categoria, contas in indice_contas.subplano(descricao, CONTAS_POR_DESCRICAO_LOTE).items():
+            contas_categoria = candidatas.setdefault(categoria, [])
+            contas_categoria.extend(c for c in contas if c not in contas_categoria)
+
+    mensagens = [
+        {"role": "system", "content": "".join([prompt_sistema, formatar_plano_de_contas(candidatas), "\n."])},
+        {"role": "user", "content": montar_pedido_lote(descricoes)},
+    ]
+    chat_completion = client.chat.completions.create(messages=mensagens, model=MODELO, temperature=0)
+    return interpretar_resposta_lote(chat_completion.choices[0].message.content, len(descricoes))
+
+# Função para ler o extrato enviado (PDF do Banrisul, Excel ou CSV) como DataFrame
+def ler_extrato(arquivo):
+    import pandas as pd
+
+    nome = arquivo.name.lower()
+    if nome.endswith(".pdf"):
+        from extrato_banrisul import parsear_extrato_pdf
+        return pd.DataFrame(parsear_extrato_pdf(arquivo.getvalue(), arquivo.name))
+    if nome.endswith(".csv"):
+        from appexcel import detectar_formato_csv
+        separador, codificacao = detectar_formato_csv(arquivo)
+        return pd.read_csv(arquivo, sep=separador, encoding=codificacao)
+    return pd.read_excel(arquivo)
+
+# Função para gerar a planilha categorizada para download
+def gerar_excel_categorizado(df):
+    import pandas as pd
+
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index=False, sheet_name='Categorizado')
+    return output.getvalue()
+
+st.caption(
+    f"Prompt do sistema: ~{tokens_prompt_sistema} tokens + até {TOP_K_CONTAS} contas candidatas por pergunta "
+    f"(índice com {len(indice_contas)} contas, versão do plano {versao_plano_de_contas[:8]})"
+)
+
+# Categorização em lote de um extrato inteiro
+with st.expander("📄 Categorização em lote de extrato"):
+    arquivo_extrato = st.file_uploader("Envie o extrato (PDF do Banrisul, Excel ou CSV)", type=["pdf", "xlsx", "csv"])
+    if arquivo_extrato:
+        df_extrato = ler_extrato(arquivo_extrato)
+        if df_extrato.empty:
+            st.warning("Nenhuma transação encontrada no arquivo. PDFs precisam ter o mês no nome (ex.: 03-2025.pdf).")
+        else:
+            colunas_extrato = list(df_extrato.columns)
+            coluna_descricao = st.selectbox(
+                "Coluna com a descrição:", colunas_extrato,
+                index=colunas_extrato.index("Descrição") if "Descrição" in colunas_extrato else 0,
+            )
+            if st.button("Categorizar extrato"):
+                progresso = st.progress(0.0, text="Categorizando...")
+                cache_categorias = obter_cache_categorias(versao_plano_de_contas)
+                categorias, origens, metricas = categorizar_em_lotes(
+                    df_extrato[coluna_descricao].fillna("").astype(str).str.strip().tolist(),
+                    enviar_lote_categorizacao,
+                    tamanho_lote=TAMANHO_LOTE,
+                    max_paralelo=LOTES_EM_PARALELO,
+                    limitador=obter_limitador(),
+                    ao_progredir=lambda feitos, total: progresso.progress(feitos / total, text=f"Lotes concluídos: {feitos}/{total}"),
+                    cache=cache_categorias,
+                )
+                cache_categorias.salvar()
+                df_categorizado = df_extrato.copy()
+                df_categorizado["Categoria Sugerida"] = categorias
+                df_categorizado["Origem"] = origens
+                st.session_state.extrato_categorizado = df_categorizado
+                st.session_state.metricas_lote = metricas
+                st.session_state.coluna_descricao_lote = coluna_descricao
+
+    if st.session_state.extrato_categorizado is not None:
+        metricas = st.session_state.metricas_lote
+        st.caption(
+            f"{metricas['linhas']} linhas ({metricas['descricoes_enviadas']} descrições enviadas ao modelo) em {metricas['lotes']} lotes, "
+            f"{metricas['segundos']:.1f}s | {metricas['linhas_por_minuto']:,.0f} linhas/min"
+            + (f" | ⚠️ {metricas['lotes_com_falha']} lote(s) com falha ({metricas['linhas_com_falha']} linhas sem categoria)"
+               if metricas['lotes_com_falha'] else "")
+        )
+        st.caption(
+            f"Cache: {metricas['taxa_acerto']:.0%} das linhas sem chamar o modelo "
+            f"({metricas['acertos_regra']} por regra, {metricas['acertos_cache']} por cache) | "
+            f"~{metricas['segundos_economizados']:.1f}s economizados"
+        )
+
+        # A coluna de categoria pode ser corrigida; ao confirmar, as categorias viram regras
+        df_editado = st.data_editor(
+            st.session_state.extrato_categorizado,
+            disabled=[c for c in st.session_state.extrato_categorizado.columns if c != "Categoria Sugerida"],
+            use_container_width=True,
+            key="editor_extrato",
+        )
+        if st.button("Confirmar categorias"):
+            coluna_descricao = st.session_state.coluna_descricao_lote
+            obter_cache_categorias(versao_plano_de_contas).confirmar(
+                dict(zip(df_editado[coluna_descricao].fillna("").astype(str).str.strip(), df_editado["Categoria Sugerida"]))
+            )
+            obter_cache_categorias(versao_plano_de_contas).salvar()
+            st.session_state.extrato_categorizado = df_editado
+            st.success("Categorias confirmadas: as próximas ocorrências dessas descrições não consultarão o modelo.")
+        st.download_button(
+            label="Baixar extrato categorizado",
+            data=gerar_excel_categorizado(df_editado),
+            file_name="extrato_categorizado.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+executar_chat(montar_prompt_pergunta, client, MODELO, chave="financeiro")
@@ -1,121 +1,69 @@
 import streamlit as st
 from streamlit_drawable_canvas import st_canvas
-from PIL import Image, ImageDraw, ImageFont
-from num2words import num2words
+from PIL import Image
 import datetime
-import io
-import base64
-from pathlib import Path
-
-MESES_PT = [
-    "janeiro", "fevereiro", "março", "abril", "maio", "junho",
-    "julho", "agosto", "setembro", "outubro", "novembro", "dezembro"
-]
-
-# Função para quebrar texto em várias linhas conforme largura máxima
-def wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int, draw: ImageDraw.ImageDraw) -> list[str]:
-    words = text.split()
-    lines = []
-    current = ""
-    for w in words:
-        test = current + (" " if current else "") + w
-        bbox = draw.textbbox((0, 0), test, font=font)
-        if bbox[2] <= max_width:
-            current = test
-        else:
-            if current:
-                lines.append(current)
-            current = w
-    if current:
-        lines.append(current)
-    return lines
-
-
-def valor_por_extenso(valor: float) -> str:
-    reais = int(valor)
-    centavos = int(round((valor - reais) * 100))
-    if reais and centavos:
-        return f"{num2words(reais, lang='pt_BR')} reais e {num2words(centavos, lang='pt_BR')} centavos"
-    if reais:
-        return f"{num2words(reais, lang='pt_BR')} reais"
-    return f"{num2words(centavos, lang='pt_BR')} centavos"
-
-
-def gerar_recibo_image(
-    valor: float,
-    valor_ext: str,
-    referente: str,
-    desc: str,
-    data_local: str,
-    assinatura_img: Image.Image
-) -> Image.Image:
-    largura, altura = 800, 350
-    img = Image.new("RGB", (largura, altura), "white")
-    draw = ImageDraw.Draw(img)
-
-    # Carrega o logo
-    script_dir = Path(__file__).parent
-    logo_path = script_dir / "logo.png"
-    logo_w = logo_h = 0
-    if logo_path.exists():
-        try:
-            logo = Image.open(logo_path)
-            logo_w, logo_h = 80, 80
-            try:
-                logo = logo.resize((logo_w, logo_h), Image.Resampling.LANCZOS)
-            except AttributeError:
-                logo = logo.resize((logo_w, logo_h), Image.ANTIALIAS)
-            mask_logo = logo.split()[3] if logo.mode in ("RGBA", "LA") else None
-            img.paste(logo, (20, 20), mask_logo)
-        except Exception:
-            logo_w = logo_h = 0
-
-    # Carrega fontes
-    fonte_path = script_dir / "DejaVuSans.ttf"
-    try:
-        fonte_titulo = ImageFont.truetype(str(fonte_path), 32)
-        fonte_texto = ImageFont.truetype(str(fonte_path), 20)
-    except IOError:
-        fonte_titulo = fonte_texto = ImageFont.load_default()
-
-    # Cabeçalho
-    x_recibo = 20 + logo_w + 10
-    draw.text((x_recibo, 45), "Recibo", fill="black", font=fonte_titulo)
-    draw.text((largura - 250, 45), f"R$ {valor:.2f}", fill="black", font=fonte_titulo)
-
-    # Corpo inicia abaixo do logo
-    y = 20 + logo_h + 20
-    linhas = [
-        f"Recebi de SABOR DE LUNA PADARIA E PASTIFÍCIO a quantia de {valor_ext}; referente a {referente}; {desc}"
-    ]
-    # Quebra as linhas conforme largura
-    max_text_width = largura - 40  # margem de 20px dos lados
-    for texto in linhas:
-        wrapped = wrap_text(texto, fonte_texto, max_text_width, draw)
-        for line in wrapped:
-            draw.text((20, y), line, fill="black", font=fonte_texto)
-            y += 25  # espaçamento vertical entre linhas
-
-    # Rodapé: assinatura e data
-    assinatura_label_y = altura - 130
-    draw.text((20, assinatura_label_y), "Assinatura:", fill="black", font=fonte_texto)
-
-    # Inserir assinatura
-    assinatura_w, assinatura_h = 300, 100
-    assin = assinatura_img.resize((assinatura_w, assinatura_h))
-    assinatura_y = assinatura_label_y + 20
-    mask_assin = assin.split()[3] if assin.mode in ("RGBA", "LA") else None
-    img.paste(assin, (20, assinatura_y), mask_assin)
-
-    # Data alinhada à direita
-    bbox = draw.textbbox((0, 0), data_local, font=fonte_texto)
-    text_w = bbox[2] - bbox[0]
-    text_h = bbox[3] - bbox[1]
-    data_x = largura - text_w - 20
-    data_y = altura - text_h - 20
-    draw.text((data_x, data_y), data_local, fill="black", font=fonte_texto)
-
-    return img
+import time
+from recibo import (
+    FORMATOS_EXPORTACAO, exportar_png, formatar_data_local, gerar_recibo_image, gerar_recibo_pdf,
+    gerar_recibos_em_lote, pdf_vetorial_disponivel, valor_por_extenso,
+)
+
+# Colunas esperadas na planilha de pagamentos do lote (sem acentos e em minúsculas)
+COLUNAS_LOTE = ["valor", "referente", "descricao", "data"]
+
+
+# Função para ler a planilha de pagamentos (Excel ou CSV) como uma lista de (valor, referente, descrição, data)
+# "Valor" é obrigatória e lida célula a célula no formato brasileiro; sem "Data", usa a data de hoje
+# Retorna (pagamentos, linhas_invalidas), com (linha da planilha, coluna, conteúdo) de cada célula que
+# não pôde ser lida: essas linhas não viram recibo e precisam ser mostradas ao usuário
+def ler_pagamentos(arquivo):
+    import pandas as pd
+    from appexcel import converter_numero_br, detectar_formato_csv, normalizar_dataframe
+    from indice_contas import dobrar_acentos
+
+    if arquivo.name.lower().endswith(".csv"):
+        separador, codificacao = detectar_formato_csv(arquivo)
+        df = pd.read_csv(arquivo, sep=separador, encoding=codificacao, dtype=str)
+    else:
+        df = pd.read_excel(arquivo)
+    df = normalizar_dataframe(df, etapas=["linhas_vazias"])
+    df.columns = [dobrar_acentos(c).strip() for c in df.columns]
+    if "valor" not in df.columns:
+        raise ValueError("A planilha precisa ter a coluna 'Valor'.")
+
+    # Texto sem nada preenchido conta como vazio
+    def vazio(celula):
+        return pd.isna(celula) or (isinstance(celula, str) and not celula.strip())
+
+    hoje = datetime.date.today()
+    pagamentos = []
+    linhas_invalidas = []
+    for indice, linha in df.iterrows():
+        numero_linha = indice + 2  # Linha 1 é o cabeçalho
+        invalidas_antes = len(linhas_invalidas)
+        valor = converter_numero_br(linha["valor"])
+        if valor is None:
+            linhas_invalidas.append((numero_linha, "Valor", "" if vazio(linha["valor"]) else str(linha["valor"])))
+
+        data = hoje
+        if "data" in df.columns and not vazio(linha["data"]):
+            convertida = pd.to_datetime(linha["data"], dayfirst=True, errors="coerce")
+            if pd.isna(convertida):
+                linhas_invalidas.append((numero_linha, "Data", str(linha["data"])))
+            else:
+                data = convertida.date()
+
+        if len(linhas_invalidas) > invalidas_antes:
+            continue
+        referente = linha["referente"] if "referente" in df.columns else ""
+        descricao = linha["descricao"] if "descricao" in df.columns else ""
+        pagamentos.append((
+            valor,
+            "" if vazio(referente) else str(referente),
+            "" if vazio(descricao) else str(descricao),
+            data,
+        ))
+    return pagamentos, linhas_invalidas
 
 
 def main():
@@ -141,29 +89,95 @@ def main():
         key="canvas"
     )
 
+    # Formato do download: PNG sem perdas por padrão; o PNG com paleta (menor, com perda de cores) é opcional
+    # e o PDF vetorial só aparece com o reportlab instalado
+    formatos = [f for f in FORMATOS_EXPORTACAO if f != "pdf" or pdf_vetorial_disponivel()]
+    formato_download = st.radio("Formato do download", formatos, index=formatos.index("png"),
+                                horizontal=True, format_func=lambda f: FORMATOS_EXPORTACAO[f][0])
+
     if st.button("Gerar Recibo"):
         if canvas.image_data is None:
             st.error("Desenhe sua assinatura antes de gerar o recibo.")
-            return
-
-        valor_ext = valor_por_extenso(valor)
-        hoje = datetime.datetime.today()
-        mes_pt = MESES_PT[hoje.month - 1]
-        data_local = f"Porto Alegre, {hoje.day} de {mes_pt} de {hoje.year}"
-
-        assin_pil = Image.fromarray(canvas.image_data.astype("uint8")).convert("RGBA")
-
-        recibo_img = gerar_recibo_image(
-            valor, valor_ext, referente, descricao, data_local, assin_pil
+        else:
+            valor_ext = valor_por_extenso(valor)
+            data_local = formatar_data_local(datetime.date.today())
+
+            assin_pil = Image.fromarray(canvas.image_data.astype("uint8")).convert("RGBA")
+
+            recibo_img = gerar_recibo_image(
+                valor, valor_ext, referente, descricao, data_local, assin_pil
+            )
+
+            st.image(recibo_img)
+
+            # O arquivo vai direto no botão de download (sem repetir a imagem em base64 na página)
+            inicio = time.perf_counter()
+            if formato_download == "pdf":
+                dados = gerar_recibo_pdf(valor, valor_ext, referente, descricao, data_local, assin_pil)
+            else:
+                dados = exportar_png(recibo_img, quantizar=formato_download == "png_quantizado")
+            tempo_codificacao = time.perf_counter() - inicio
+            st.download_button(
+                label="📥 Baixar Recibo",
+                data=dados,
+                file_name=f"recibo.{'pdf' if formato_download == 'pdf' else 'png'}",
+                mime=FORMATOS_EXPORTACAO[formato_download][1],
+                on_click="ignore",
+            )
+            st.caption(f"{FORMATOS_EXPORTACAO[formato_download][0]}: {len(dados) / 1024:.1f} KB, "
+                       f"gerado em {tempo_codificacao * 1000:.0f} ms")
+
+    # Vários recibos de uma vez, a partir de uma planilha de pagamentos, com a mesma assinatura
+    with st.expander("📄 Recibos em lote a partir de planilha"):
+        arquivo = st.file_uploader(
+            "Planilha com as colunas Valor, Referente, Descrição e Data (Excel ou CSV)", type=["xlsx", "csv"]
         )
-
-        st.image(recibo_img)
-
-        buf = io.BytesIO()
-        recibo_img.save(buf, format="PNG")
-        b64 = base64.b64encode(buf.getvalue()).decode()
-        href = f'<a href="data:image/png;base64,{b64}" download="recibo.png">📥 Baixar Recibo</a>'
-        st.markdown(href, unsafe_allow_html=True)
+        formato = st.radio("Formato", ["zip", "pdf"], horizontal=True,
+                           format_func=lambda f: "Zip com PNGs" if f == "zip" else "PDF com uma página por recibo")
+        if arquivo and st.button("Gerar recibos em lote"):
+            if canvas.image_data is None:
+                st.error("Desenhe sua assinatura antes de gerar os recibos.")
+                return
+            try:
+                pagamentos, linhas_invalidas = ler_pagamentos(arquivo)
+            except ValueError as erro:
+                st.error(str(erro))
+                return
+            # Nenhum recibo é gerado enquanto houver linha que não pôde ser lida (nada é descartado em silêncio)
+            if linhas_invalidas:
+                st.error(
+                    f"{len(linhas_invalidas)} célula(s) não puderam ser lidas. Corrija a planilha "
+                    "(valores como 1.234,56 ou R$ 150,00; datas como 05/03/2025) e envie novamente."
+                )
+                st.dataframe(
+                    [{"Linha": linha, "Coluna": coluna, "Conteúdo": conteudo}
+                     for linha, coluna, conteudo in linhas_invalidas],
+                    hide_index=True,
+                )
+                return
+            if not pagamentos:
+                st.warning("Nenhum pagamento com valor encontrado na planilha.")
+                return
+
+            assin_pil = Image.fromarray(canvas.image_data.astype("uint8")).convert("RGBA")
+            progresso = st.progress(0.0, text="Gerando recibos...")
+            inicio = time.perf_counter()
+            dados, tempos = gerar_recibos_em_lote(
+                pagamentos, assin_pil, formato,
+                ao_progredir=lambda feitos, total: progresso.progress(feitos / total, text=f"{feitos}/{total} recibos"),
+            )
+            decorrido = time.perf_counter() - inicio
+            st.caption(
+                f"{len(tempos)} recibos em {decorrido:.1f}s | por recibo: média {sum(tempos) / len(tempos) * 1000:.0f} ms, "
+                f"máximo {max(tempos) * 1000:.0f} ms"
+            )
+            st.download_button(
+                label="📥 Baixar recibos",
+                data=dados,
+                file_name=f"recibos.{formato}",
+                mime="application/zip" if formato == "zip" else "application/pdf",
+                on_click="ignore",
+            )
 
 if __name__ == "__main__":
     main()
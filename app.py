@@ -0,0 +1,20 @@
+import streamlit as st
+
+# App único com todas as ferramentas, cada uma em uma página
+# As páginas rodam no mesmo processo e compartilham os recursos de recursos.py e nucleo_chat.py
+# (sessão HTTP, aplicação MSAL, cliente do modelo e caches em disco); cada página só é carregada ao ser aberta
+paginas = {
+    "Planilhas": [
+        st.Page("appexcel.py", title="Normalizar Excel", icon="📊", default=True),
+        st.Page("NotasFiscais.py", title="Gerador de Recibos", icon="🧾"),
+    ],
+    "Chats": [
+        st.Page("ChatBot2.py", title="Chat com IA", icon="💬"),
+        st.Page("ChatFinanceiroV2.py", title="Chat Financeiro", icon="💰"),
+    ],
+    "Conciliação": [
+        st.Page("comparar_lancamentos_banrisul.py", title="Reconciliação Financeira", icon="🔄"),
+    ],
+}
+
+st.navigation(paginas).run()
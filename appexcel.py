@@ -1,54 +1,530 @@
-import streamlit as st
-import pandas as pd
 from io import BytesIO
+from functools import partial
+import codecs
+import csv
+import datetime
+import math
+import numbers
 import os
+import re
+import tempfile
+import time
+
+# Padrões reconhecidos como número em formato brasileiro ("1.234,56", "R$ 10,00", "-3")
+RE_NUMERO_BR = r"(?:R\$\s*)?[-+]?(?:\d{1,3}(?:\.\d{3})+|\d+)(?:,\d+)?"
+# Valores com zero à esquerda (CEP, códigos, contas) não devem virar número
+RE_ZERO_A_ESQUERDA = r"(?:R\$\s*)?[-+]?0\d"
+# Acima de 15 dígitos o float64 perde precisão: valores assim são códigos (chaves de NF-e, cartões), não números
+MAX_DIGITOS_NUMERO = 15
+
+# Padrões de data em texto e o formato usado para converter cada um
+FORMATOS_DATA = [
+    (r"\d{1,2}/\d{1,2}/\d{4}", "%d/%m/%Y"),
+    (r"\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}", "%d/%m/%Y %H:%M"),
+    (r"\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}:\d{2}", "%d/%m/%Y %H:%M:%S"),
+    (r"\d{4}-\d{2}-\d{2}", "%Y-%m-%d"),
+]
+
+
+# Posições das colunas de texto (object ou string) do DataFrame
+def _colunas_texto(df):
+    import pandas as pd
+
+    return [i for i, dtype in enumerate(df.dtypes) if dtype == object or isinstance(dtype, pd.StringDtype)]
+
+
+# Máscara (linhas x colunas) das células preenchidas; textos só com espaços contam como vazios
+def _mascara_preenchida(df):
+    mascara = df.notna().to_numpy()
+    for i in _colunas_texto(df):
+        texto = df.iloc[:, i].astype("string").str.strip()
+        mascara[:, i] &= texto.ne("").fillna(False).to_numpy(dtype=bool)
+    return mascara
+
+
+# Etapa: remover colunas em que nenhuma célula está preenchida
+def remover_colunas_vazias(df):
+    return df.loc[:, _mascara_preenchida(df).any(axis=0)]
+
+
+# Etapa: remover linhas em que nenhuma célula está preenchida
+def remover_linhas_vazias(df):
+    return df.loc[_mascara_preenchida(df).any(axis=1)]
+
+
+# Etapa: remover linhas que repetem o cabeçalho (exportações paginadas costumam repeti-lo)
+def remover_cabecalhos_repetidos(df):
+    import numpy as np
+
+    if df.empty:
+        return df
+    iguais = np.ones(len(df), dtype=bool)
+    algum_igual = np.zeros(len(df), dtype=bool)
+    for i, nome in enumerate(df.columns):
+        coluna = df.iloc[:, i]
+        preenchida = coluna.notna().to_numpy()
+        igual = coluna.astype("string").str.strip().eq(str(nome).strip()).fillna(False).to_numpy(dtype=bool)
+        iguais &= igual | ~preenchida
+        algum_igual |= igual
+    return df.loc[~(iguais & algum_igual)]
+
+
+# Etapa: repetir o último valor nas lacunas deixadas por células mescladas
+def preencher_celulas_mescladas(df, colunas=None):
+    if not colunas:
+        return df
+    df = df.copy()
+    for coluna in colunas:
+        if coluna in df.columns:
+            df[coluna] = df[coluna].ffill()
+    return df
+
+
+def _e_numero(valor):
+    return isinstance(valor, numbers.Real) and not isinstance(valor, bool)
+
+
+def _e_data(valor):
+    import numpy as np
+
+    return isinstance(valor, (datetime.date, np.datetime64))
+
+
+# Texto das células str de uma coluna (sem espaços nas pontas), a máscara das células str preenchidas
+# e a máscara das demais células preenchidas (números e datas que já vieram tipados do Excel)
+def _texto_preenchido(coluna):
+    import pandas as pd
+
+    if isinstance(coluna.dtype, pd.StringDtype):
+        e_texto = coluna.notna()
+    else:
+        e_texto = coluna.map(lambda valor: isinstance(valor, str)).astype(bool)
+    texto = coluna.where(e_texto).astype("string").str.strip()
+    preenchida = (texto.notna() & texto.ne("")).fillna(False).astype(bool)
+    return texto, preenchida, ~e_texto & coluna.notna()
+
+
+# Verifica se todas as células preenchidas são números brasileiros
+# (sem zero à esquerda nem dígitos demais, que indicam código)
+def _todos_numeros_br(valores):
+    return (
+        bool(valores.str.fullmatch(RE_NUMERO_BR).all())
+        and not valores.str.match(RE_ZERO_A_ESQUERDA).any()
+        and not valores.str.count(r"\d").gt(MAX_DIGITOS_NUMERO).any()
+    )
+
+
+# Converte as datas em texto de uma coluna; retorna as datas e se todas as células preenchidas foram convertidas
+def _converter_texto_em_datas(texto, preenchida):
+    import pandas as pd
+
+    valores = texto[preenchida]
+    reconhecida = pd.Series(False, index=valores.index)
+    datas = pd.Series(pd.NaT, index=texto.index, dtype="datetime64[ns]")
+    for padrao, formato in FORMATOS_DATA:
+        casa = valores.str.fullmatch(padrao) & ~reconhecida
+        if casa.any():
+            convertidas = pd.to_datetime(valores[casa], format=formato, errors="coerce")
+            datas.loc[convertidas.index] = convertidas
+            reconhecida |= casa
+    return datas, bool(reconhecida.all()) and bool(datas[preenchida].notna().all())
+
+
+# Converte uma única célula no formato brasileiro ("1.234,56", "R$ 10,00", "1.500") em número
+# Números que já vieram como número (Excel) passam direto; retorna None se a célula não for um número
+def converter_numero_br(valor):
+    if _e_numero(valor):
+        return None if math.isnan(valor) else float(valor)
+    if not isinstance(valor, str):
+        return None
+    texto = valor.strip()
+    if not re.fullmatch(RE_NUMERO_BR, texto) or len(re.findall(r"\d", texto)) > MAX_DIGITOS_NUMERO:
+        return None
+    texto = re.sub(r"^R\$\s*", "", texto).replace(".", "").replace(",", ".")
+    return float(texto)
+
+
+# Etapa: converter colunas de texto com números no formato brasileiro ("1.234,56") em números
+# Só as células str são interpretadas; células que já são número (Excel) passam direto
+# `colunas`, se informado, são as colunas já reconhecidas como numéricas no arquivo inteiro (leitura em blocos);
+# sem ele, cada coluna de texto é avaliada no próprio df
+def converter_numeros_br(df, colunas=None):
+    import pandas as pd
+
+    df = df.copy()
+    for i in _colunas_texto(df):
+        coluna = df.iloc[:, i]
+        texto, preenchida, outras = _texto_preenchido(coluna)
+        if colunas is not None:
+            if df.columns[i] not in colunas:
+                continue
+        elif (not preenchida.any() or not _todos_numeros_br(texto[preenchida])
+              or not coluna[outras].map(_e_numero).all()):
+            continue
+        numeros = (
+            texto.str.replace(r"^R\$\s*", "", regex=True)
+                 .str.replace(".", "", regex=False)
+                 .str.replace(",", ".", regex=False)
+        )
+        convertidos = pd.to_numeric(numeros.where(preenchida), errors="coerce").astype("float64")
+        ja_numeros = outras & coluna.map(_e_numero).astype(bool)
+        if ja_numeros.any():
+            convertidos = convertidos.mask(ja_numeros, pd.to_numeric(coluna.where(ja_numeros), errors="coerce"))
+        df.isetitem(i, convertidos)
+    return df
+
+
+# Etapa: converter colunas de texto com datas ("05/03/2025", "2025-03-05") em datas
+# Só as células str são interpretadas; células que já são data (Excel) passam direto
+# `colunas` funciona como em converter_numeros_br
+def converter_datas(df, colunas=None):
+    import pandas as pd
+
+    df = df.copy()
+    for i in _colunas_texto(df):
+        if colunas is not None and df.columns[i] not in colunas:
+            continue
+        coluna = df.iloc[:, i]
+        texto, preenchida, outras = _texto_preenchido(coluna)
+        if not preenchida.any():
+            continue
+        datas, todas = _converter_texto_em_datas(texto, preenchida)
+        ja_datas = outras & coluna.map(_e_data).astype(bool)
+        if (todas and ja_datas.equals(outras)) or colunas is not None:
+            if ja_datas.any():
+                datas = datas.mask(ja_datas, pd.to_datetime(coluna.where(ja_datas), errors="coerce"))
+            df.isetitem(i, datas)
+    return df
+
+
+# Etapas disponíveis do pipeline de normalização, na ordem em que são aplicadas
+ETAPAS_NORMALIZACAO = {
+    "linhas_vazias": ("Remover linhas vazias", remover_linhas_vazias),
+    "cabecalhos_repetidos": ("Remover cabeçalhos repetidos", remover_cabecalhos_repetidos),
+    "celulas_mescladas": ("Preencher células mescladas", preencher_celulas_mescladas),
+    "numeros_br": ("Converter números em texto (1.234,56)", converter_numeros_br),
+    "datas": ("Converter datas em texto", converter_datas),
+    "colunas_vazias": ("Remover colunas vazias", remover_colunas_vazias),
+}
+# Conversões de tipo ficam desligadas por padrão: mudam o conteúdo das células, não só a forma da planilha
+ETAPAS_PADRAO = [chave for chave in ETAPAS_NORMALIZACAO if chave not in ("numeros_br", "datas")]
+
+# Quantidade de linhas lidas por bloco nos formatos CSV e Parquet
+TAMANHO_BLOCO = 100_000
+# Bytes lidos do início do CSV para detectar separador e codificação
+TAMANHO_AMOSTRA_CSV = 64 * 1024
+
+
+# Função para aplicar o pipeline de normalização a um DataFrame
+# `tempos`, se informado, recebe o tempo gasto em cada etapa
+# `funcoes`, se informado, substitui a função de algumas etapas (mesma chave de ETAPAS_NORMALIZACAO)
+def normalizar_dataframe(df, etapas=None, colunas_mescladas=None, tempos=None, funcoes=None):
+    etapas = ETAPAS_PADRAO if etapas is None else etapas
+    for chave in ETAPAS_NORMALIZACAO:
+        if chave not in etapas:
+            continue
+        rotulo, funcao = ETAPAS_NORMALIZACAO[chave]
+        if funcoes and chave in funcoes:
+            funcao = funcoes[chave]
+        elif chave == "celulas_mescladas":
+            funcao = partial(funcao, colunas=colunas_mescladas)
+        inicio = time.perf_counter()
+        linhas_antes, colunas_antes = df.shape
+        df = funcao(df)
+        if tempos is not None:
+            tempos.append({
+                "Etapa": rotulo,
+                "Tempo (ms)": (time.perf_counter() - inicio) * 1000,
+                "Linhas removidas": linhas_antes - df.shape[0],
+                "Colunas removidas": colunas_antes - df.shape[1],
+            })
+    return df
+
+
+# Função para ler o Excel, registrando o tempo de leitura em `tempos`
+def ler_excel(arquivo, tempos=None):
+    inicio = time.perf_counter()
+    import pandas as pd
 
-# Função para normalizar o Excel (remover colunas em branco)
-def normalizar_excel(arquivo):
-    # Carregar o arquivo Excel para um DataFrame
     df = pd.read_excel(arquivo)
+    if tempos is not None:
+        tempos.append({"Etapa": "Leitura do arquivo", "Tempo (ms)": (time.perf_counter() - inicio) * 1000,
+                       "Linhas removidas": 0, "Colunas removidas": 0})
+    return df
 
-    # Remover colunas que possuem apenas valores NaN (vazios)
-    df_normalizado = df.dropna(axis=1, how='all')
+# Função para normalizar o Excel (limpeza configurável em etapas)
+def normalizar_excel(arquivo, etapas=None, colunas_mescladas=None, tempos=None):
+    # Carregar o arquivo Excel para um DataFrame
+    df = ler_excel(arquivo, tempos)
+
+    return normalizar_dataframe(df, etapas, colunas_mescladas, tempos)
+
+# Lê os primeiros bytes de um caminho ou arquivo enviado, sem consumir o arquivo
+def _ler_amostra(arquivo, tamanho):
+    if hasattr(arquivo, "read"):
+        arquivo.seek(0)
+        amostra = arquivo.read(tamanho)
+        arquivo.seek(0)
+        return amostra
+    with open(arquivo, "rb") as f:
+        return f.read(tamanho)
+
+
+# Bytes inválidos em UTF-8 depois da amostra (arquivo com trechos em latin-1) são lidos como latin-1,
+# em vez de interromper a leitura no meio, com blocos já gravados
+def _utf8_ou_latin1(erro):
+    return erro.object[erro.start:erro.end].decode("latin-1"), erro.end
+
+
+codecs.register_error("utf8_ou_latin1", _utf8_ou_latin1)
+
+
+# Função para detectar separador e codificação de um CSV (padrão brasileiro: ";" e latin-1)
+def detectar_formato_csv(arquivo):
+    amostra = _ler_amostra(arquivo, TAMANHO_AMOSTRA_CSV)
+    if amostra.startswith(codecs.BOM_UTF8):
+        codificacao = "utf-8-sig"
+    else:
+        try:
+            # Decodificador incremental tolera um caractere cortado no fim da amostra
+            codecs.getincrementaldecoder("utf-8")().decode(amostra, final=False)
+            codificacao = "utf-8"
+        except UnicodeDecodeError:
+            codificacao = "latin-1"
+
+    texto = amostra.decode(codificacao, errors="ignore")
+    try:
+        separador = csv.Sniffer().sniff(texto.split("\n", 1)[0], delimiters=";,\t|").delimiter
+    except csv.Error:
+        separador = ";"
+    return separador, codificacao
+
+
+# Função para ler CSV ou Parquet em blocos de `tamanho_bloco` linhas
+def ler_em_blocos(arquivo, formato, tamanho_bloco=TAMANHO_BLOCO):
+    if hasattr(arquivo, "seek"):
+        arquivo.seek(0)
+    if formato == "csv":
+        import pandas as pd
+
+        separador, codificacao = detectar_formato_csv(arquivo)
+        # Tudo como texto: as etapas de conversão decidem o tipo de cada coluna
+        yield from pd.read_csv(arquivo, sep=separador, encoding=codificacao, encoding_errors="utf8_ou_latin1",
+                               dtype=str, chunksize=tamanho_bloco)
+    elif formato == "parquet":
+        import pyarrow.parquet as pq
+        for lote in pq.ParquetFile(arquivo).iter_batches(batch_size=tamanho_bloco):
+            yield lote.to_pandas()
+    else:
+        raise ValueError(f"Formato não suportado para leitura em blocos: {formato}")
+
+
+# Primeira passada pelos blocos: colunas preenchidas e tipo (número BR ou data) de cada coluna de texto
+# no arquivo inteiro, para que todos os blocos recebam a mesma conversão
+# Retorna a máscara das colunas preenchidas e os nomes das colunas numéricas e de datas
+def analisar_blocos(arquivo, formato, etapas, tamanho_bloco=TAMANHO_BLOCO):
+    preenchidas = None
+    numericas = {}
+    datas = {}
+    for bloco in ler_em_blocos(arquivo, formato, tamanho_bloco):
+        # Colunas e tipos são avaliados depois das mesmas remoções de linhas aplicadas na segunda passada
+        # (uma coluna preenchida só nos cabeçalhos repetidos é vazia, como na leitura do Excel)
+        if "cabecalhos_repetidos" in etapas:
+            bloco = remover_cabecalhos_repetidos(bloco)
+        mascara = _mascara_preenchida(bloco).any(axis=0)
+        preenchidas = mascara if preenchidas is None else preenchidas | mascara
+
+        for i in _colunas_texto(bloco):
+            nome = bloco.columns[i]
+            coluna = bloco.iloc[:, i]
+            texto, preenchida, outras = _texto_preenchido(coluna)
+            if not preenchida.any() and not outras.any():
+                continue
+            valores = texto[preenchida]
+            if "numeros_br" in etapas and numericas.get(nome, True):
+                numericas[nome] = _todos_numeros_br(valores) and bool(coluna[outras].map(_e_numero).all())
+            if "datas" in etapas and datas.get(nome, True):
+                datas[nome] = (_converter_texto_em_datas(texto, preenchida)[1]
+                               and bool(coluna[outras].map(_e_data).all()))
+
+    colunas_numericas = {nome for nome, todas in numericas.items() if todas}
+    colunas_datas = {nome for nome, todas in datas.items() if todas} - colunas_numericas
+    return preenchidas, colunas_numericas, colunas_datas
+
+
+# Função para normalizar CSV/Parquet bloco a bloco, gravando o resultado como CSV em `destino`
+# Colunas vazias e tipos das colunas são decididos em uma primeira passada por todos os blocos
+def normalizar_em_blocos(arquivo, formato, destino, etapas=None, colunas_mescladas=None,
+                         tamanho_bloco=TAMANHO_BLOCO, tempos=None):
+    etapas = ETAPAS_PADRAO if etapas is None else etapas
+    etapas_bloco = [e for e in etapas if e not in ("colunas_vazias", "celulas_mescladas")]
+
+    inicio = time.perf_counter()
+    preenchidas, colunas_numericas, colunas_datas = analisar_blocos(arquivo, formato, etapas, tamanho_bloco)
+    colunas_mantidas = preenchidas if "colunas_vazias" in etapas else None
+    if tempos is not None:
+        tempos.append({"Etapa": "Detectar colunas vazias e tipos (1ª passada)",
+                       "Tempo (ms)": (time.perf_counter() - inicio) * 1000,
+                       "Linhas removidas": 0,
+                       "Colunas removidas": 0 if colunas_mantidas is None else int((~colunas_mantidas).sum())})
+
+    # As conversões usam os tipos decididos no arquivo inteiro, e não os de cada bloco
+    etapas_tipadas = {
+        "numeros_br": partial(converter_numeros_br, colunas=colunas_numericas),
+        "datas": partial(converter_datas, colunas=colunas_datas),
+    }
+
+    total_linhas = 0
+    ultimos_valores = {}
+    tempos_bloco = []
+    for numero, bloco in enumerate(ler_em_blocos(arquivo, formato, tamanho_bloco)):
+        if colunas_mantidas is not None:
+            bloco = bloco.loc[:, colunas_mantidas]
+        bloco = normalizar_dataframe(bloco, etapas_bloco, tempos=tempos_bloco, funcoes=etapas_tipadas)
+
+        # Células mescladas: o último valor de um bloco continua valendo no início do próximo
+        if "celulas_mescladas" in etapas and colunas_mescladas:
+            bloco = bloco.copy()
+            for coluna in colunas_mescladas:
+                if coluna in bloco.columns:
+                    bloco[coluna] = bloco[coluna].ffill()
+                    if coluna in ultimos_valores:
+                        bloco[coluna] = bloco[coluna].fillna(ultimos_valores[coluna])
+                    validos = bloco[coluna].dropna()
+                    if not validos.empty:
+                        ultimos_valores[coluna] = validos.iloc[-1]
 
-    return df_normalizado
+        bloco.to_csv(destino, sep=";", decimal=",", index=False, header=numero == 0)
+        total_linhas += len(bloco)
+
+    # Soma os tempos de cada etapa em todos os blocos
+    if tempos is not None and tempos_bloco:
+        import pandas as pd
+
+        tempos.extend(
+            pd.DataFrame(tempos_bloco).groupby("Etapa", sort=False, as_index=False).sum().to_dict("records")
+        )
+    return total_linhas
+
+
+# Formato de entrada a partir da extensão do arquivo
+def formato_do_arquivo(nome):
+    extensao = os.path.splitext(nome)[1].lower().lstrip(".")
+    return {"xlsx": "xlsx", "csv": "csv", "txt": "csv", "parquet": "parquet"}.get(extensao)
 
 # Função para converter DataFrame em arquivo Excel para download
 def gerar_excel_para_download(df):
+    import pandas as pd
+
     output = BytesIO()
     with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
         df.to_excel(writer, index=False, sheet_name='Dados Normalizados')
     return output.getvalue()
 
+# Cria o arquivo temporário da saída em blocos da sessão, apagando o da normalização anterior
+def _novo_arquivo_saida(estado):
+    anterior = estado.get("arquivo_saida_blocos")
+    if anterior and os.path.exists(anterior):
+        os.remove(anterior)
+    descritor, caminho = tempfile.mkstemp(prefix="normalizado_", suffix=".csv")
+    os.close(descritor)
+    estado["arquivo_saida_blocos"] = caminho
+    return caminho
+
+
+# Conteúdo do arquivo de saída, lido só no clique do download
+def _ler_bytes(caminho):
+    with open(caminho, "rb") as f:
+        return f.read()
+
+
 # Interface Streamlit
-st.title("Normalizador de Arquivos Excel V2")
+def main():
+    import streamlit as st
+
+    st.title("Normalizador de Arquivos Excel V2")
+
+    # Upload do arquivo (Excel, CSV ou Parquet)
+    arquivo_carregado = st.file_uploader("Envie o arquivo Excel, CSV ou Parquet", type=["xlsx", "csv", "parquet"])
+
+    # Escolha das etapas de normalização
+    with st.expander("Etapas de normalização"):
+        etapas_escolhidas = [
+            chave for chave, (rotulo, _) in ETAPAS_NORMALIZACAO.items()
+            if st.checkbox(rotulo, value=chave in ETAPAS_PADRAO, key=f"etapa_{chave}")
+        ]
+
+    if arquivo_carregado:
+        # O pandas só é carregado depois do upload: a primeira tela (upload e etapas) abre sem ele
+        import pandas as pd
+
+        formato = formato_do_arquivo(arquivo_carregado.name)
+        nome_base = os.path.splitext(arquivo_carregado.name)[0]
+        tempos_etapas = []
+
+        if formato in ("csv", "parquet"):
+            # CSV e Parquet são processados em blocos, sem carregar tudo na memória
+            colunas_mescladas = []
+            if "celulas_mescladas" in etapas_escolhidas:
+                colunas_disponiveis = list(next(ler_em_blocos(arquivo_carregado, formato, 1)).columns)
+                colunas_mescladas = st.multiselect("Colunas com células mescladas:", colunas_disponiveis)
+
+            # O resultado vai bloco a bloco para um arquivo temporário em disco (um por sessão, trocado a cada
+            # normalização); o conteúdo só é lido quando o botão de download é clicado
+            caminho_saida = _novo_arquivo_saida(st.session_state)
+            with open(caminho_saida, "w", encoding="utf-8-sig", newline="") as saida_csv:
+                total_linhas = normalizar_em_blocos(arquivo_carregado, formato, saida_csv, etapas_escolhidas,
+                                                    colunas_mescladas, tempos=tempos_etapas)
+
+            st.write(f"Arquivo após a normalização ({total_linhas} linhas):")
+            st.download_button(label="Baixar CSV Normalizado",
+                               data=partial(_ler_bytes, caminho_saida),
+                               file_name=nome_base + "_convertido.csv",
+                               mime="text/csv",
+                               on_click="ignore")
+
+            with st.expander("Tempo por etapa"):
+                st.dataframe(pd.DataFrame(tempos_etapas), use_container_width=True)
+
+            # Prévia das primeiras linhas do resultado
+            st.write(pd.read_csv(caminho_saida, sep=";", decimal=",", encoding="utf-8-sig", nrows=1000))
+            return
+
+        # Exibir o arquivo carregado como DataFrame
+        #st.write("Arquivo carregado:")
+        #df_carregado = pd.read_excel(arquivo_carregado)
+        #st.write(df_carregado)
+
+        df_carregado = ler_excel(arquivo_carregado, tempos_etapas)
+
+        # Colunas com células mescladas (ex.: agrupamentos na primeira coluna)
+        colunas_mescladas = []
+        if "celulas_mescladas" in etapas_escolhidas:
+            colunas_mescladas = st.multiselect("Colunas com células mescladas:", list(df_carregado.columns))
 
-# Upload do arquivo Excel
-arquivo_carregado = st.file_uploader("Envie o arquivo Excel", type=["xlsx"])
+        # Normalizar o Excel
+        df_normalizado = normalizar_dataframe(df_carregado, etapas_escolhidas, colunas_mescladas, tempos_etapas)
 
-if arquivo_carregado:
-    # Exibir o arquivo carregado como DataFrame
-    #st.write("Arquivo carregado:")
-    #df_carregado = pd.read_excel(arquivo_carregado)
-    #st.write(df_carregado)
+        # Gerar o nome do arquivo convertido
+        nome_arquivo_convertido = nome_base + "_convertido.xlsx"
 
-    # Normalizar o Excel (remover colunas vazias)
-    df_normalizado = normalizar_excel(arquivo_carregado)
+        #Titlo
+        st.write("Arquivo após a normalização:")
 
-    # Gerar o nome do arquivo convertido
-    nome_arquivo_original = arquivo_carregado.name
-    nome_arquivo_convertido = os.path.splitext(nome_arquivo_original)[0] + "_convertido.xlsx"
+        # Botão para baixar o arquivo processado
+        arquivo_excel_normalizado = gerar_excel_para_download(df_normalizado)
+        st.download_button(label="Baixar Excel Normalizado",
+                           data=arquivo_excel_normalizado,
+                           #file_name="arquivo_normalizado.xlsx",
+                           file_name=nome_arquivo_convertido,
+                           mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
 
-    #Titlo
-    st.write("Arquivo após a normalização (remover colunas vazias):")
+        # Tempo gasto em cada etapa
+        with st.expander("Tempo por etapa"):
+            st.dataframe(pd.DataFrame(tempos_etapas), use_container_width=True)
 
-    # Botão para baixar o arquivo processado
-    arquivo_excel_normalizado = gerar_excel_para_download(df_normalizado)
-    st.download_button(label="Baixar Excel Normalizado",
-                       data=arquivo_excel_normalizado,
-                       #file_name="arquivo_normalizado.xlsx",
-                       file_name=nome_arquivo_convertido,
-                       mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        # Exibir o DataFrame normalizado
+        st.write(df_normalizado)
 
-    # Exibir o DataFrame normalizado
-    st.write(df_normalizado)
+if __name__ == "__main__":
+    main()
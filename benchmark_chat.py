@@ -0,0 +1,71 @@
+import argparse
+import statistics
+import sys
+
+from historico_chat import GerenciadorHistorico, resumidor_com_modelo
+from nucleo_chat import MODELO, ProvedorFalso, transmitir_resposta
+
+
+# Percentil simples (método do vizinho mais próximo) de uma lista de valores
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+# Simula uma conversa com o provedor falso e mede latência, novas tentativas e tokens enviados por pergunta
+def executar(perguntas, latencia_primeiro_token, latencia_por_token, taxa_falha, tamanho_resposta, semente):
+    resposta = " ".join(["palavra"] * tamanho_resposta)
+    client = ProvedorFalso(latencia_primeiro_token, latencia_por_token, taxa_falha,
+                           responder=lambda mensagens: resposta, semente=semente)
+    gerenciador = GerenciadorHistorico(resumir=resumidor_com_modelo(client, MODELO))
+    prompt_sistema = "Você é um assistente financeiro. " * 50
+
+    resultados = []
+    falhas = 0
+    for i in range(perguntas):
+        gerenciador.adicionar("user", f"Pergunta {i}: como categorizar o lançamento {i} do extrato?")
+        mensagens = gerenciador.montar_mensagens(prompt_sistema)
+        try:
+            texto, metricas = transmitir_resposta(client, MODELO, mensagens, espera=0.01)
+        except Exception:
+            falhas += 1
+            gerenciador.mensagens.pop()
+            continue
+        gerenciador.adicionar("assistant", texto)
+        resultados.append(metricas)
+    return resultados, falhas, client
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o núcleo do chat com um provedor falso, sem usar a API real.")
+    parser.add_argument("-n", "--perguntas", type=int, default=50, help="Número de perguntas da conversa simulada")
+    parser.add_argument("--primeiro-token", type=float, default=0.05, help="Latência até o primeiro token (s)")
+    parser.add_argument("--por-token", type=float, default=0.001, help="Latência entre pedaços da resposta (s)")
+    parser.add_argument("--taxa-falha", type=float, default=0.1, help="Probabilidade de falha de cada requisição")
+    parser.add_argument("--tamanho-resposta", type=int, default=150, help="Palavras por resposta")
+    parser.add_argument("--semente", type=int, default=0, help="Semente das falhas simuladas")
+    args = parser.parse_args(argv)
+
+    resultados, falhas, client = executar(args.perguntas, args.primeiro_token, args.por_token, args.taxa_falha,
+                                          args.tamanho_resposta, args.semente)
+    if not resultados:
+        print("Nenhuma pergunta respondida.")
+        return 1
+
+    primeiro_token = [r["primeiro_token_s"] for r in resultados]
+    total = [r["total_s"] for r in resultados]
+    print(f"{len(resultados)} respostas, {falhas} pergunta(s) sem resposta após as novas tentativas")
+    print(f"chamadas ao provedor: {client.chamadas} ({client.falhas} falhas simuladas, inclui resumos)")
+    print(f"novas tentativas: {sum(r['tentativas'] - 1 for r in resultados)}")
+    print(f"primeiro token: p50 {percentil(primeiro_token, 50):.3f}s | p95 {percentil(primeiro_token, 95):.3f}s")
+    print(f"total: p50 {percentil(total, 50):.3f}s | p95 {percentil(total, 95):.3f}s")
+    print(
+        f"tokens de entrada: média {statistics.mean(r['entrada'] for r in resultados):.0f} | "
+        f"máximo {max(r['entrada'] for r in resultados)} | "
+        f"saída: média {statistics.mean(r['saida'] for r in resultados):.0f}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from conciliacao import Transacoes, conciliar, ordinal_da_data, para_centavos
+
+NOMES = [
+    "JOAO DA SILVA", "MARIA CONCEICAO", "CARLOS TREIN", "ANA PAULA SOUZA", "PADARIA CENTRAL LTDA",
+    "JOSE PEREIRA", "MERCADO BOM PRECO", "LUCIA FERREIRA", "PEDRO HENRIQUE", "FRANCISCA LIMA",
+]
+
+
+# Ano sintético de PIX recebidos em várias contas, nos formatos de entrada da conciliação:
+# lançamentos da API do Sistema MR e registros do parsear_extrato_pdf (com a conta da subpasta)
+def gerar_dados(contas, por_dia, dias, semente=0):
+    aleatorio = random.Random(semente)
+    clientes = [f"{nome} {i:02d}" for nome in NOMES for i in range(50)]
+    inicio = date(2025, 1, 1)
+    api = []
+    extrato = []
+    for numero in range(contas):
+        conta = f"06091541{numero:02d}"
+        for dia in range(dias):
+            data = inicio + timedelta(days=dia)
+            for _ in range(por_dia):
+                valor = aleatorio.randrange(100, 500_000) / 100
+                extrato.append({
+                    "Data": data.strftime("%d/%m/%Y"),
+                    "Descrição": f"PIX RECEBIDO NOME: {aleatorio.choice(clientes)}",
+                    "Valor": valor,
+                    "Conta": conta,
+                })
+                # ~10% dos lançamentos do sistema ficam sem correspondente no extrato
+                # (diferença de reais inteiros: com 1 centavo o abs(...) < 0.01 anterior às vezes concilia,
+                # por erro de arredondamento do float)
+                if aleatorio.random() < 0.1:
+                    valor += aleatorio.randrange(1, 10)
+                api.append({
+                    "data": data.isoformat(), "valor": valor, "conta": f"BANRISUL {conta}",
+                    "descricao": "PIX RECEBIDO", "categoria": "1.9 - TED/DOC/PIX",
+                })
+    return api, extrato
+
+
+# Representação anterior: um dict por lançamento (como a tela montava antes)
+def carregar_dicts(api, extrato):
+    sistema = []
+    for item in api:
+        data = date.fromisoformat(item["data"])
+        sistema.append({
+            "Posto": "Matriz",
+            "dataSistema": data.strftime("%d/%m/%Y"),
+            "dateObj": data,
+            "CategoriaSistema": str(item["categoria"]),
+            "ValorSistema": float(item["valor"]),
+            "ContaBancariaSistema": str(item["conta"]),
+            "DescriçõesPDF": "",
+        })
+    pdf = [dict(r) for r in extrato]
+    return sistema, pdf
+
+
+def carregar_compacto(api, extrato):
+    sistema = Transacoes()
+    for item in api:
+        sistema.adicionar(date.fromisoformat(item["data"]).toordinal(), para_centavos(item["valor"]), conta=item["conta"])
+    pdf = Transacoes()
+    for r in extrato:
+        pdf.adicionar(ordinal_da_data(r["Data"]), para_centavos(r["Valor"]), r["Descrição"], r["Conta"])
+    return sistema, pdf
+
+
+# Cruzamento anterior: para cada lançamento do sistema, percorre todo o extrato (referência)
+def conciliar_referencia(sistema, pdf, exigir_conta):
+    resultado = []
+    for s_tx in sistema:
+        s_banco = s_tx["ContaBancariaSistema"].upper()
+        descricoes = [
+            p_tx["Descrição"] for p_tx in pdf
+            if p_tx["Data"] == s_tx["dataSistema"] and abs(p_tx["Valor"] - s_tx["ValorSistema"]) < 0.01
+            and (not exigir_conta or p_tx["Conta"].upper() in s_banco)
+        ]
+        resultado.append(" | ".join(sorted(set(descricoes))) if descricoes else None)
+    return resultado
+
+
+# Pico de memória (MB) alocado por funcao(*args) e o resultado retornado
+def pico_de_memoria(funcao, *args):
+    tracemalloc.start()
+    resultado = funcao(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pico / 1024 / 1024, resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara memória e tempo da conciliação: dicts x colunas compactas.")
+    parser.add_argument("--contas", type=int, default=4, help="Contas Banrisul do posto")
+    parser.add_argument("--por-dia", type=int, default=60, help="PIX recebidos por conta por dia")
+    parser.add_argument("--dias", type=int, default=365, help="Dias de lançamentos")
+    parser.add_argument("--dias-referencia", type=int, default=10,
+                        help="Dias usados no cruzamento anterior (percorre o extrato inteiro a cada lançamento)")
+    args = parser.parse_args(argv)
+
+    api, extrato = gerar_dados(args.contas, args.por_dia, args.dias)
+    print(f"[dados] {len(api)} lançamentos do sistema, {len(extrato)} do extrato")
+
+    mb_dicts, (sistema_d, pdf_d) = pico_de_memoria(carregar_dicts, api, extrato)
+    mb_compacto, (sistema_c, pdf_c) = pico_de_memoria(carregar_compacto, api, extrato)
+    print(f"[memória] dicts {mb_dicts:.1f} MB | colunas {mb_compacto:.1f} MB | {mb_dicts / mb_compacto:.1f}x menos")
+
+    inicio = time.perf_counter()
+    resultado = conciliar(sistema_c, pdf_c, True)
+    tempo = time.perf_counter() - inicio
+    print(f"[conciliação] {len(resultado)} lançamentos em {tempo * 1000:.0f} ms, "
+          f"{sum(r is not None for r in resultado)} conciliados")
+
+    import numpy as np
+    import pandas  # noqa: F401 (o import não entra na medida da conversão)
+
+    mb_df, df = pico_de_memoria(pdf_c.para_dataframe)
+    sem_copia = np.shares_memory(df["Centavos"].to_numpy(), np.frombuffer(pdf_c.centavos, dtype=np.int64))
+    print(f"[dataframe] {len(df)} linhas, {mb_df:.1f} MB alocados na conversão, centavos sem cópia: {sem_copia}")
+
+    # Correção e tempo contra o cruzamento anterior em um recorte do período
+    api_r, extrato_r = gerar_dados(args.contas, args.por_dia, args.dias_referencia, semente=1)
+    sistema_d, pdf_d = carregar_dicts(api_r, extrato_r)
+    sistema_c, pdf_c = carregar_compacto(api_r, extrato_r)
+    divergencias = 0
+    for exigir_conta in (False, True):
+        inicio = time.perf_counter()
+        anterior = conciliar_referencia(sistema_d, pdf_d, exigir_conta)
+        tempo_anterior = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        novo = conciliar(sistema_c, pdf_c, exigir_conta)
+        tempo_novo = time.perf_counter() - inicio
+        diferentes = sum(a != n for a, n in zip(anterior, novo))
+        divergencias += diferentes
+        print(f"[referência] {args.dias_referencia} dias, exigir_conta={exigir_conta}: {diferentes} diferentes | "
+              f"anterior {tempo_anterior * 1000:.0f} ms, nova {tempo_novo * 1000:.1f} ms")
+    return 1 if divergencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PASTA = Path(__file__).parent
+
+# Pontos de entrada medidos e como cada um chega à primeira tela:
+# - "streamlit": o script roda de verdade no AppTest, até o fim ou o primeiro st.stop (ex.: tela de login)
+# - "cli": o script roda como __main__ em um diretório vazio (nada para normalizar)
+PONTOS_DE_ENTRADA = {
+    "app.py": "streamlit",
+    "appexcel.py": "streamlit",
+    "ChatBot2.py": "streamlit",
+    "ChatFinanceiroV2.py": "streamlit",
+    "NotasFiscais.py": "streamlit",
+    "comparar_lancamentos_banrisul.py": "streamlit",
+    "normalizar_lote.py": "cli",
+}
+MARCADOR = "--- inicio da medicao ---"
+PREFIXO_ERRO = "ERRO DO SCRIPT: "
+TIMEOUT_APP = 30  # segundos
+
+# Executado antes do marcador: o próprio Streamlit (já carregado pelo servidor) e o que ele importa
+# sob demanda na primeira execução de um script não entram na conta
+# (módulos do streamlit importados depois do marcador também são descontados)
+PREAMBULO = {
+    "streamlit": [
+        "import sys",
+        "from streamlit.testing.v1 import AppTest",
+        "AppTest.from_string('import streamlit as st; st.write(1)').run()",
+    ],
+    "cli": ["import runpy, sys, tempfile"],
+}
+
+
+# Código que executa o ponto de entrada até a primeira tela; o erro, se houver, vai para a saída padrão
+def codigo_de_execucao(arquivo, tipo):
+    if tipo == "streamlit":
+        return [
+            f"at = AppTest.from_file({arquivo!r}, default_timeout={TIMEOUT_APP}).run()",
+            "if at.exception:",
+            f"    print({PREFIXO_ERRO!r} + at.exception[0].message)",
+        ]
+    return [
+        f"sys.argv = [{arquivo!r}, tempfile.mkdtemp()]",
+        "try:",
+        f"    runpy.run_path({arquivo!r}, run_name='__main__')",
+        "except SystemExit:",
+        "    pass",
+        "except Exception as erro:",
+        f"    print({PREFIXO_ERRO!r} + str(erro))",
+    ]
+
+
+# Executa o ponto de entrada em um processo novo com -X importtime, contando só o que é importado depois
+# do preâmbulo (inclusive imports adiados para dentro de funções, se o caminho até a primeira tela passar por eles)
+# Retorna o tempo total (ms), o tempo acumulado (ms) de cada pacote importado diretamente e o erro do script
+def medir_imports(arquivo, tipo="streamlit"):
+    codigo = [*PREAMBULO[tipo], f"sys.stderr.write({MARCADOR!r} + '\\n')", *codigo_de_execucao(arquivo, tipo)]
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "\n".join(codigo)],
+        cwd=PASTA, capture_output=True, text=True,
+    )
+    linhas = resultado.stderr.splitlines()
+    if resultado.returncode != 0 or MARCADOR not in linhas:
+        raise RuntimeError((linhas or ["falha sem mensagem"])[-1])
+
+    pacotes = {}
+    for linha in linhas[linhas.index(MARCADOR) + 1:]:
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        _, acumulado, nome = linha[len("import time:"):].split("|")
+        # Pacotes de primeiro nível (sem recuo): o custo acumulado inclui o que eles importam
+        if not nome[1:].startswith(" ") and nome.strip().partition(".")[0] != "streamlit":
+            pacotes[nome.strip()] = pacotes.get(nome.strip(), 0) + int(acumulado) / 1000
+    erros = [l[len(PREFIXO_ERRO):] for l in resultado.stdout.splitlines() if l.startswith(PREFIXO_ERRO)]
+    return sum(pacotes.values()), pacotes, erros[-1] if erros else ""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Mede o tempo de import de cada ponto de entrada até a primeira tela (-X importtime)."
+    )
+    parser.add_argument("arquivos", nargs="*", default=list(PONTOS_DE_ENTRADA), help="Pontos de entrada a medir")
+    parser.add_argument("-n", "--repeticoes", type=int, default=3, help="Execuções por ponto de entrada (mediana)")
+    parser.add_argument("--top", type=int, default=5, help="Pacotes mais pesados listados por ponto de entrada")
+    parser.add_argument("--json", help="Grava o resultado neste arquivo JSON")
+    args = parser.parse_args(argv)
+
+    relatorio = {}
+    for arquivo in args.arquivos:
+        try:
+            medicoes = [
+                medir_imports(arquivo, PONTOS_DE_ENTRADA.get(arquivo, "streamlit")) for _ in range(args.repeticoes)
+            ]
+        except RuntimeError as erro:
+            print(f"{arquivo}: [erro] {erro}")
+            continue
+        total = statistics.median(m[0] for m in medicoes)
+        pacotes, erro = medicoes[-1][1], medicoes[-1][2]
+        pesados = sorted(pacotes.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        relatorio[arquivo] = {
+            "total_ms": round(total, 1),
+            "pacotes_ms": {n: round(t, 1) for n, t in pesados},
+            "erro": erro,
+        }
+        # Um erro no script encerra a execução antes da primeira tela: a medida fica incompleta
+        print(f"{arquivo}: {total:.0f} ms" + (f" [parou com erro: {erro}]" if erro else ""))
+        for nome, tempo in pesados:
+            print(f"    {nome}: {tempo:.0f} ms")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(relatorio, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import argparse
+import base64
+import random
+import sys
+import time
+from decimal import Decimal
+
+from num2words import num2words
+from PIL import Image, ImageDraw, ImageFont
+
+from extenso import grupo_por_extenso, numero_por_extenso
+
+from recibo import (
+    ARQUIVO_FONTE, FORMATOS_EXPORTACAO, TAMANHO_TEXTO, carregar_fonte, exportar_png, gerar_recibo_image,
+    gerar_recibo_pdf, medir_palavra, pdf_vetorial_disponivel, valor_por_extenso, wrap_text,
+)
+
+PALAVRAS = (
+    "pagamento referente à manutenção preventiva dos equipamentos da fábrica, serviços de limpeza, "
+    "higienização e reposição de peças; aluguel do imóvel da matriz em Xangrilá, conciliação bancária "
+    "do mês de março, fornecedores de farinha, açúcar e laticínios, comissão sobre vendas, "
+    "transferência PIX recebida de João Conceição, 13º salário, INSS, FGTS e vale-transporte"
+).split()
+
+
+# Quebra de linhas anterior, que mede a linha inteira com draw.textbbox a cada palavra (referência)
+def wrap_text_referencia(text, font, max_width, draw):
+    words = text.split()
+    lines = []
+    current = ""
+    for w in words:
+        test = current + (" " if current else "") + w
+        bbox = draw.textbbox((0, 0), test, font=font)
+        if bbox[2] <= max_width:
+            current = test
+        else:
+            if current:
+                lines.append(current)
+            current = w
+    if current:
+        lines.append(current)
+    return lines
+
+
+def gerar_textos(quantidade, palavras, semente=0):
+    aleatorio = random.Random(semente)
+    return [" ".join(aleatorio.choice(PALAVRAS) for _ in range(palavras)) for _ in range(quantidade)]
+
+
+# Fontes comparadas: a do recibo e, se existir, a DejaVuSans do sistema
+def fontes_para_comparar():
+    fontes = {"recibo": carregar_fonte(TAMANHO_TEXTO)}
+    for caminho in (ARQUIVO_FONTE, "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "DejaVuSans.ttf"):
+        try:
+            fontes["DejaVuSans"] = ImageFont.truetype(str(caminho), TAMANHO_TEXTO)
+            break
+        except IOError:
+            continue
+    return fontes
+
+
+def medir(funcao, textos, font, largura, draw):
+    inicio = time.perf_counter()
+    for texto in textos:
+        funcao(texto, font, largura, draw)
+    return time.perf_counter() - inicio
+
+
+# Valor por extenso anterior: num2words duas vezes e centavos calculados com float (referência)
+def valor_por_extenso_referencia(valor):
+    reais = int(valor)
+    centavos = int(round((valor - reais) * 100))
+    if reais and centavos:
+        return f"{num2words(reais, lang='pt_BR')} reais e {num2words(centavos, lang='pt_BR')} centavos"
+    if reais:
+        return f"{num2words(reais, lang='pt_BR')} reais"
+    return f"{num2words(centavos, lang='pt_BR')} centavos"
+
+
+# Valida o extenso contra o num2words em uma amostra de inteiros (todas as ordens de grandeza até os trilhões)
+# e compara valor_por_extenso com a versão anterior em valores com centavos
+def comparar_extenso(amostras, semente=0):
+    aleatorio = random.Random(semente)
+    inteiros = list(range(min(amostras, 100_000))) + [
+        int(10 ** aleatorio.uniform(0, 14.999)) for _ in range(amostras)
+    ]
+    divergentes = [n for n in inteiros if numero_por_extenso(n) != num2words(n, lang="pt_BR")]
+    print(f"[extenso] {len(inteiros)} inteiros, {len(divergentes)} diferentes do num2words")
+    for n in divergentes[:5]:
+        print(f"  {n}: {numero_por_extenso(n)!r} != {num2words(n, lang='pt_BR')!r}")
+
+    # Valores de recibo: até 10 milhões, sempre com duas casas decimais
+    centavos = [aleatorio.randrange(1_000_000_000) for _ in range(amostras)]
+    valores = [c / 100 for c in centavos]
+    centavos_errados = sum(
+        valor_por_extenso(v) != valor_por_extenso_referencia(v) for v in valores
+    )
+    print(f"[extenso] {len(valores)} valores, {centavos_errados} com centavos diferentes da versão anterior (float)")
+    # Meio centavo (planilhas com três casas): o float arredonda para baixo ou vira "cem centavos"
+    for valor in (0.995, 1.005, 2.675):
+        print(f"  {valor}: {valor_por_extenso(valor)!r} (anterior: {valor_por_extenso_referencia(valor)!r})")
+
+    for nome, funcao in (("anterior", valor_por_extenso_referencia), ("nova", valor_por_extenso)):
+        numero_por_extenso.cache_clear()
+        grupo_por_extenso.cache_clear()
+        inicio = time.perf_counter()
+        for valor in valores:
+            funcao(valor)
+        tempo = time.perf_counter() - inicio
+        print(f"[extenso] {nome}: {len(valores) / tempo:,.0f} valores/s")
+    inicio = time.perf_counter()
+    for valor in valores:
+        valor_por_extenso(Decimal(str(valor)))
+    tempo = time.perf_counter() - inicio
+    print(f"[extenso] nova (cache cheio, Decimal): {len(valores) / tempo:,.0f} valores/s")
+    return len(divergentes)
+
+
+# Tamanho e tempo de geração do arquivo de download de um recibo em cada formato
+# "png (base64)" é o link embutido na página usado antes do botão de download
+def comparar_exportacao(repeticoes):
+    assinatura = Image.new("RGBA", (800, 150), (255, 255, 255, 0))
+    ImageDraw.Draw(assinatura).line([(10, 110), (250, 40), (500, 100), (760, 30)], fill="black", width=3)
+    dados = (1234.56, valor_por_extenso(1234.56), "Matriz, Carlos Trein, Gelato, Xangrilá",
+             gerar_textos(1, 30)[0], "Porto Alegre, 5 de março de 2025", assinatura)
+    img = gerar_recibo_image(*dados)
+
+    exportadores = {
+        "png (base64)": lambda: base64.b64encode(exportar_png(img)),
+        "png": lambda: exportar_png(img),
+        "png_quantizado": lambda: exportar_png(img, quantizar=True),
+    }
+    if pdf_vetorial_disponivel():
+        exportadores["pdf"] = lambda: gerar_recibo_pdf(*dados)
+    for nome, exportar in exportadores.items():
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            arquivo = exportar()
+        tempo = (time.perf_counter() - inicio) / repeticoes
+        rotulo = FORMATOS_EXPORTACAO[nome][0] if nome in FORMATOS_EXPORTACAO else nome
+        print(f"[exportação] {rotulo}: {len(arquivo) / 1024:.1f} KB em {tempo * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede a geração do recibo: valor por extenso, formatos de download e quebra de linhas.")
+    parser.add_argument("-n", "--textos", type=int, default=500, help="Quantidade de descrições por teste")
+    parser.add_argument("--largura", type=int, default=760, help="Largura máxima da linha (px)")
+    parser.add_argument("--repeticoes", type=int, default=20, help="Repetições de cada formato de exportação")
+    parser.add_argument("--amostras", type=int, default=100_000, help="Valores sorteados na validação do extenso")
+    args = parser.parse_args(argv)
+
+    divergencias = comparar_extenso(args.amostras)
+    comparar_exportacao(args.repeticoes)
+
+    draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+    for nome, font in fontes_para_comparar().items():
+        # Correção: as mesmas linhas que a implementação anterior, em textos curtos e longos
+        textos = gerar_textos(args.textos, 30) + gerar_textos(args.textos // 10, 400, semente=1)
+        diferentes = sum(
+            wrap_text(t, font, args.largura, draw) != wrap_text_referencia(t, font, args.largura, draw) for t in textos
+        )
+        divergencias += diferentes
+        print(f"[{nome}] {len(textos)} textos, {diferentes} com quebra diferente da anterior")
+
+        for palavras in (30, 200, 1000):
+            textos = gerar_textos(max(1, args.textos // (palavras // 30)), palavras, semente=2)
+            medir_palavra.cache_clear()
+            anterior = medir(wrap_text_referencia, textos, font, args.largura, draw)
+            fria = medir(wrap_text, textos, font, args.largura, draw)
+            quente = medir(wrap_text, textos, font, args.largura, draw)
+            print(
+                f"[{nome}] {len(textos)} textos de {palavras} palavras: anterior {anterior * 1000:.0f} ms | "
+                f"nova {fria * 1000:.0f} ms (cache vazio), {quente * 1000:.0f} ms (cache cheio) | "
+                f"{anterior / quente:.0f}x"
+            )
+    return 1 if divergencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
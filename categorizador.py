@@ -0,0 +1,279 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from indice_contas import dobrar_acentos
+
+
+# Limitador de taxa: espaça as requisições para não passar de `por_minuto` chamadas por minuto
+class LimitadorTaxa:
+    def __init__(self, por_minuto):
+        self.intervalo = 60.0 / por_minuto if por_minuto else 0.0
+        self._proximo = 0.0
+        self._trava = threading.Lock()
+
+    def aguardar(self):
+        with self._trava:
+            agora = time.monotonic()
+            horario = max(agora, self._proximo)
+            self._proximo = horario + self.intervalo
+        time.sleep(max(0.0, horario - agora))
+
+
+# Mensagem do usuário pedindo a categoria de várias descrições de uma vez, com resposta em JSON
+def montar_pedido_lote(descricoes):
+    linhas = "\n".join(f"{i}. {descricao}" for i, descricao in enumerate(descricoes, start=1))
+    return (
+        "Categorize cada transação abaixo usando uma categoria do plano de contas, "
+        "no formato \"DRE - Descrição\". Responda apenas com um JSON no formato "
+        f"{{\"categorias\": [\"...\"]}}, na mesma ordem e com exatamente {len(descricoes)} itens.\n\n"
+        f"{linhas}"
+    )
+
+
+# Extrai a lista de categorias da resposta do modelo (JSON ou, na falta dele, lista numerada)
+def interpretar_resposta_lote(texto, quantidade):
+    categorias = None
+    inicio, fim = texto.find("{"), texto.rfind("}")
+    if inicio != -1 and fim > inicio:
+        try:
+            categorias = json.loads(texto[inicio:fim + 1]).get("categorias")
+        except (ValueError, AttributeError):
+            categorias = None
+
+    if not isinstance(categorias, list):
+        numeradas = re.findall(r"^\s*(\d+)[.)\-]\s*(.+?)\s*$", texto, flags=re.MULTILINE)
+        por_numero = {int(numero): categoria for numero, categoria in numeradas}
+        categorias = [por_numero.get(i, "") for i in range(1, quantidade + 1)]
+
+    categorias = [str(c).strip() for c in categorias[:quantidade]]
+    return categorias + [""] * (quantidade - len(categorias))
+
+
+# Chave de cache de uma descrição: sem acentos, datas, números e pontuação
+# ("PIX RECEBIDO 05/03 NOME: JOÃO 123" e "Pix recebido 12/04 nome: Joao 987" viram a mesma chave)
+def normalizar_descricao(texto):
+    texto = dobrar_acentos(texto)
+    texto = re.sub(r"\d{1,2}/\d{1,2}(?:/\d{2,4})?", " ", texto)
+    texto = re.sub(r"[\d\W_]+", " ", texto)
+    return texto.strip().upper()
+
+
+# Travas por arquivo de cache: instâncias diferentes (uma por versão do plano) gravam no mesmo JSON
+_TRAVAS_ARQUIVO = {}
+_TRAVA_TRAVAS = threading.Lock()
+
+
+def _trava_do_arquivo(caminho):
+    with _TRAVA_TRAVAS:
+        return _TRAVAS_ARQUIVO.setdefault(caminho.resolve(), threading.Lock())
+
+
+# Conteúdo do JSON do cache; arquivo ausente ou corrompido conta como vazio
+def _ler_cache(caminho):
+    try:
+        return json.loads(caminho.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+# Grava o JSON em um arquivo temporário na mesma pasta e o coloca no lugar com os.replace:
+# uma gravação interrompida não deixa o cache pela metade
+def _gravar_atomico(caminho, dados):
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=caminho.parent, prefix=caminho.name, suffix=".tmp")
+    try:
+        with os.fdopen(descritor, "w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+# Cache de categorias na frente do modelo, persistido em JSON:
+# - regras: categorias confirmadas pelo usuário (valem para qualquer versão do plano de contas)
+# - memo: respostas do modelo, válidas apenas para a versão do plano em que foram obtidas
+# Ao salvar, só as entradas novas desta instância são mescladas ao que está no disco
+class CacheCategorias:
+    def __init__(self, caminho=None, versao_plano=None):
+        self.caminho = Path(caminho) if caminho else None
+        self.versao_plano = versao_plano
+        self.regras = {}
+        self.memo = {}
+        self.segundos_por_descricao = 0.0
+        self._regras_novas = {}
+        self._memo_novo = {}
+        self._tempo_novo = False
+        self._trava = threading.Lock()
+        if self.caminho and self.caminho.exists():
+            dados = _ler_cache(self.caminho)
+            self.regras = dados.get("regras", {})
+            self.memo = dados.get("memo", {})
+            self.segundos_por_descricao = dados.get("segundos_por_descricao", 0.0)
+
+    # Retorna (categoria, origem) para a descrição, ou (None, None) se for preciso consultar o modelo
+    def consultar(self, descricao):
+        chave = normalizar_descricao(descricao)
+        if chave in self.regras:
+            return self.regras[chave], "regra"
+        entrada = self.memo.get(chave)
+        if entrada and entrada.get("versao") == self.versao_plano:
+            return entrada["categoria"], "cache"
+        return None, None
+
+    # Guarda as respostas do modelo e, com `segundos`, atualiza a média de segundos por descrição consultada
+    def registrar_modelo(self, categorias_por_descricao, segundos=None):
+        with self._trava:
+            for descricao, categoria in categorias_por_descricao.items():
+                if categoria:
+                    entrada = {"categoria": categoria, "versao": self.versao_plano}
+                    self.memo[normalizar_descricao(descricao)] = entrada
+                    self._memo_novo[normalizar_descricao(descricao)] = entrada
+            if categorias_por_descricao and segundos is not None:
+                media = segundos / len(categorias_por_descricao)
+                anterior = self.segundos_por_descricao
+                self.segundos_por_descricao = media if not anterior else 0.8 * anterior + 0.2 * media
+                self._tempo_novo = True
+
+    # Registra categorias confirmadas pelo usuário como regras
+    def confirmar(self, categorias_por_descricao):
+        with self._trava:
+            for descricao, categoria in categorias_por_descricao.items():
+                if categoria:
+                    self.regras[normalizar_descricao(descricao)] = categoria
+                    self._regras_novas[normalizar_descricao(descricao)] = categoria
+
+    # Mescla as entradas novas com o arquivo (que pode ter sido gravado por outra instância) e grava
+    def salvar(self):
+        if not self.caminho:
+            return
+        with _trava_do_arquivo(self.caminho), self._trava:
+            disco = _ler_cache(self.caminho)
+            dados = {
+                "regras": {**disco.get("regras", {}), **self._regras_novas},
+                "memo": {**disco.get("memo", {}), **self._memo_novo},
+                "segundos_por_descricao": (
+                    self.segundos_por_descricao if self._tempo_novo
+                    else disco.get("segundos_por_descricao", self.segundos_por_descricao)
+                ),
+            }
+            try:
+                _gravar_atomico(self.caminho, dados)
+            except OSError:
+                return  # Sem permissão de escrita: o cache continua valendo em memória
+
+            # Passa a enxergar também o que as outras instâncias gravaram
+            self.regras = dict(dados["regras"])
+            self.memo = dict(dados["memo"])
+            self.segundos_por_descricao = dados["segundos_por_descricao"]
+            self._regras_novas = {}
+            self._memo_novo = {}
+            self._tempo_novo = False
+
+
+# Função para categorizar muitas descrições agrupando-as em lotes enviados em paralelo
+# `enviar_lote(descricoes)` faz a chamada ao modelo e retorna uma categoria por descrição
+# Com `cache`, só as descrições sem regra nem resposta guardada vão para o modelo
+# Retorna (categorias, origens, métricas), com a origem de cada categoria: "regra", "cache" ou "modelo"
+# (ou "falha", com categoria vazia, para as descrições de lotes que falharam em todas as tentativas)
+def categorizar_em_lotes(descricoes, enviar_lote, tamanho_lote=25, max_paralelo=4, limitador=None,
+                         tentativas=3, ao_progredir=None, cache=None):
+    inicio = time.perf_counter()
+
+    # Descrições repetidas no extrato são enviadas uma única vez; descrições vazias não são enviadas
+    unicas = [d for d in dict.fromkeys(descricoes) if d]
+
+    encontradas = {}
+    if cache:
+        pendentes = {}
+        for descricao in unicas:
+            categoria, origem = cache.consultar(descricao)
+            if categoria:
+                encontradas[descricao] = (categoria, origem)
+            else:
+                # Descrições com a mesma chave normalizada são consultadas uma única vez
+                pendentes.setdefault(normalizar_descricao(descricao), descricao)
+        unicas = list(pendentes.values())
+
+    lotes = [unicas[i:i + tamanho_lote] for i in range(0, len(unicas), tamanho_lote)]
+
+    falhas = 0
+    trava = threading.Lock()
+
+    def processar(lote):
+        nonlocal falhas
+        for tentativa in range(tentativas):
+            if limitador:
+                limitador.aguardar()
+            try:
+                resultado = enviar_lote(lote)
+                break
+            except Exception:
+                if tentativa == tentativas - 1:
+                    with trava:
+                        falhas += 1
+                    resultado = None
+                    break
+                time.sleep(2 ** tentativa)
+        return resultado
+
+    # O progresso é informado na thread que chamou a função (o Streamlit só desenha a partir dela)
+    resultados = [None] * len(lotes)
+    with ThreadPoolExecutor(max_workers=max_paralelo) as executor:
+        futuros = {executor.submit(processar, lote): posicao for posicao, lote in enumerate(lotes)}
+        for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+            resultados[futuros[futuro]] = futuro.result()
+            if ao_progredir:
+                ao_progredir(concluidos, len(lotes))
+
+    categoria_por_descricao = {}
+    com_falha = set()
+    for lote, categorias in zip(lotes, resultados):
+        if categorias is None:
+            com_falha.update(lote)
+        else:
+            categoria_por_descricao.update(zip(lote, categorias))
+    segundos = time.perf_counter() - inicio
+
+    if cache:
+        # Lotes com falha não entram no cache nem na média de tempo (que incluiria as esperas entre tentativas)
+        cache.registrar_modelo(categoria_por_descricao, None if falhas else segundos)
+        por_chave = {normalizar_descricao(d): (c, "modelo") for d, c in categoria_por_descricao.items()}
+        por_chave.update((normalizar_descricao(d), ("", "falha")) for d in com_falha)
+
+    categorias, origens = [], []
+    for descricao in descricoes:
+        if descricao in encontradas:
+            categoria, origem = encontradas[descricao]
+        elif descricao in categoria_por_descricao:
+            categoria, origem = categoria_por_descricao[descricao], "modelo"
+        elif descricao in com_falha:
+            categoria, origem = "", "falha"
+        elif cache and descricao:
+            categoria, origem = por_chave.get(normalizar_descricao(descricao), ("", "falha"))
+        else:
+            categoria, origem = "", ""
+        categorias.append(categoria)
+        origens.append(origem)
+
+    acertos = sum(origem in ("regra", "cache") for origem in origens)
+    metricas = {
+        "linhas": len(descricoes),
+        "descricoes_enviadas": len(unicas),
+        "lotes": len(lotes),
+        "lotes_com_falha": falhas,
+        "linhas_com_falha": origens.count("falha"),
+        "segundos": segundos,
+        "linhas_por_minuto": len(descricoes) / segundos * 60 if segundos else 0.0,
+        "acertos_regra": origens.count("regra"),
+        "acertos_cache": origens.count("cache"),
+        "taxa_acerto": acertos / len(descricoes) if descricoes else 0.0,
+        "segundos_economizados": len(encontradas) * cache.segundos_por_descricao if cache else 0.0,
+    }
+    return categorias, origens, metricas
@@ -1,11 +1,7 @@
 import os
 import re
-import msal
-import requests
 import urllib.parse
-import pandas as pd
 import streamlit as st
-import pypdf
 import io
 import calendar
 import unicodedata
@@ -113,6 +109,12 @@ if not st.session_state["logged_in"]:
                 st.error("Usuário ou senha incorretos.")
         st.stop()
 
+# Dependencias pesadas carregadas so depois do login: a tela de login aparece sem esperar por elas
+# (o leitor de PDF, usado so na conciliacao, e importado quando ela e executada)
+import pandas as pd
+from conciliacao import Transacoes, conciliar, para_centavos
+from recursos import obter_app_msal, obter_sessao_http
+
 # Funcao para carregar variaveis do .env
 def carregar_env():
     env_path = Path("c:/Users/wellp/Downloads/Extratores/.env")
@@ -155,6 +157,9 @@ FOLDER_ID = obter_config("ONEDRIVE_FOLDER_ID")
 API_URL = obter_config("API_URL")
 API_KEY = obter_config("API_KEY")
 
+# Categoria do Sistema MR conciliada com os PIX recebidos do extrato
+CATEGORIA_CONCILIADA = "1.9 - TED/DOC/PIX"
+
 # Lista de empresas do Sistema MR (carregada obrigatoriamente do Streamlit Secrets)
 EMPRESAS = []
 try:
@@ -171,14 +176,11 @@ if not EMPRESAS:
 DE_PARA_POSTOS = {emp.get("nome"): emp.get("pastaOneDrive") for emp in EMPRESAS if emp.get("nome")}
 
 # Funcao de autenticacao MSAL
-@st.cache_data(ttl=3000)
+# A aplicacao MSAL e compartilhada pelo processo e reaproveita o token ate ele expirar
 def obter_token_acesso():
     if not all([TENANT_ID, CLIENT_ID, CLIENT_SECRET]):
         return None
-    authority = f"https://login.microsoftonline.com/{TENANT_ID}"
-    app = msal.ConfidentialClientApplication(
-        CLIENT_ID, authority=authority, client_credential=CLIENT_SECRET
-    )
+    app = obter_app_msal(TENANT_ID, CLIENT_ID, CLIENT_SECRET)
     result = app.acquire_token_for_client(scopes=["https://graph.microsoft.com/.default"])
     return result.get("access_token")
 
@@ -188,7 +190,7 @@ def obter_filhos(drive_id, item_id, token):
     url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{item_id}/children"
     children = []
     while url:
-        res = requests.get(url, headers=headers)
+        res = obter_sessao_http().get(url, headers=headers)
         if res.status_code != 200:
             break
         data = res.json()
@@ -259,70 +261,6 @@ def arquivo_sobrepoe_datas(nome_arquivo, start_date, end_date):
     
     return file_start <= end_date and start_date <= file_end
 
-# Parser de extrato PDF
-def parsear_extrato_pdf(conteudo_pdf, nome_arquivo):
-    match = re.search(r"(\d{2})-(\d{4})", nome_arquivo)
-    if not match:
-        return []
-    mes = match.group(1)
-    ano = match.group(2)
-    
-    pdf_file = io.BytesIO(conteudo_pdf)
-    reader = pypdf.PdfReader(pdf_file)
-    
-    # Coleta todas as linhas do PDF inteiro para permitir busca de descrição cruzando quebras de página
-    linhas = []
-    for page in reader.pages:
-        text = page.extract_text()
-        if text:
-            linhas.extend(text.split("\n"))
-            
-    registros = []
-    dia_atual = None
-    
-    for idx, linha in enumerate(linhas):
-        dia_match = re.match(r"^(\d{2})(?:\s{2,}|\s*$)", linha)
-        if dia_match:
-            dia_atual = dia_match.group(1)
-            conteudo_linha = linha[dia_match.end():].strip()
-        else:
-            conteudo_linha = linha.strip()
-            
-        if "PIX RECEBIDO" in conteudo_linha:
-            valor_match = re.search(r"([\d\.,]+)$", conteudo_linha)
-            if valor_match:
-                valor_str = valor_match.group(1)
-                valor_float = float(valor_str.replace(".", "").replace(",", "."))
-            else:
-                valor_float = 0.0
-            
-            nome_pagador = ""
-            # Procura a linha com "NOME:" nas próximas linhas (máximo de 15 linhas à frente)
-            # para contemplar quando a descrição fica na página seguinte devido à quebra de página
-            for j in range(idx + 1, min(idx + 16, len(linhas))):
-                proxima_linha = linhas[j].strip()
-                if not proxima_linha:
-                    continue
-                if proxima_linha.startswith("NOME:"):
-                    nome_pagador = f" {proxima_linha}"
-                    break
-                # Se encontrarmos uma nova transação ou início de bloco de dia, interrompe a busca
-                if re.match(r"^\d{2}\s+", proxima_linha) or re.search(r"\d+,\d{2}[-D]?\s*$", proxima_linha):
-                    break
-                keywords = ["TED", "DOC", "PIX RECEBIDO", "PAGAMENTO", "COMPRA", "CREDITO", "DEBITO", "SALDO", "ANTECIPACAO", "COFRE", "BANRI", "APLICACAO", "TARIF", "JUROS"]
-                if any(proxima_linha.startswith(k) for k in keywords):
-                    break
-                    
-            descricao = f"PIX RECEBIDO{nome_pagador}"
-            data_completa = f"{dia_atual}/{mes}/{ano}" if dia_atual else f"Unknown/{mes}/{ano}"
-            
-            registros.append({
-                "Data": data_completa,
-                "Descrição": descricao,
-                "Valor": valor_float
-            })
-    return registros
-
 # Funcao para buscar lancamentos da API financeira
 def obter_lancamentos_api(posto_id, ultimos_dias):
     headers = {
@@ -331,7 +269,7 @@ def obter_lancamentos_api(posto_id, ultimos_dias):
     }
     url = f"{API_URL}/v1/api/export/lancamentos/{posto_id}?ultimosDias={ultimos_dias}"
     try:
-        res = requests.get(url, headers=headers)
+        res = obter_sessao_http().get(url, headers=headers)
         if res.status_code == 200:
             return res.json().get("result", [])
     except Exception:
@@ -503,6 +441,8 @@ with tab_rec:
             st.stop()
             
         with st.spinner("Realizando consulta ao Sistema MR e lendo extratos em PDF..."):
+            from extrato_banrisul import parsear_extrato_pdf
+
             # 1. Carrega dados do sistema MR
             ultimos_dias = (hoje - start_date).days
             # Garante que puxa pelo menos o periodo necessario
@@ -517,7 +457,7 @@ with tab_rec:
             # - Categoria é "1.9 - TED/DOC/PIX"
             # - Banco contém "BANRISUL"
             # - Data está no intervalo selecionado
-            lancamentos_sistema = []
+            lancamentos_sistema = Transacoes()
             for item in lancamentos_brutos:
                 descricao = str(item.get("descricao", ""))
                 categoria = str(item.get("categoria", ""))
@@ -532,92 +472,44 @@ with tab_rec:
                 if (
                     start_date <= dt <= end_date and
                     "PIX RECEBIDO" in descricao.upper() and
-                    categoria == "1.9 - TED/DOC/PIX" and
+                    categoria == CATEGORIA_CONCILIADA and
                     "BANRISUL" in banco.upper()
                 ):
-                    # Formata data para DD/MM/YYYY
-                    data_formatada = dt.strftime("%d/%m/%Y")
-                    
-                    lancamentos_sistema.append({
-                        "Posto": empresa_nome,
-                        "dataSistema": data_formatada,
-                        "dateObj": dt,
-                        "CategoriaSistema": categoria,
-                        "ValorSistema": float(item.get("valor", 0)),
-                        "ContaBancariaSistema": banco,
-                        "DescriçõesPDF": ""
-                    })
+                    lancamentos_sistema.adicionar(dt.toordinal(), para_centavos(item.get("valor", 0)), conta=banco)
 
             # 2. Carrega e parseia arquivos PDF do OneDrive
-            pdf_transacoes = []
+            pdf_transacoes = Transacoes()
             if pasta_cliente and pdfs_periodo:
                 for p in pdfs_periodo:
                     download_url = p.get("@microsoft.graph.downloadUrl")
                     if download_url:
-                        res = requests.get(download_url)
+                        res = obter_sessao_http().get(download_url)
                         if res.status_code == 200:
                             registros = parsear_extrato_pdf(res.content, p.get("name"))
-                            for r in registros:
-                                r["Conta"] = p.get("account") # subpasta da conta
-                                pdf_transacoes.append(r)
+                            # Conta = subpasta da conta
+                            pdf_transacoes.adicionar_registros_extrato(registros, p.get("account"))
 
             # 3. Conciliação / Cruzamento
-            tabela_conciliada = []
-            matched_count = 0
-            unmatched_count = 0
-            
             # Identifica se vamos forçar correspondência de conta (se houver mais de 1 conta no PDF)
             enforce_account = len(contas_disponiveis) > 1 or (len(contas_disponiveis) == 1 and contas_disponiveis[0] != "Padrão")
             
-            for s_tx in lancamentos_sistema:
-                s_date_str = s_tx["dataSistema"]
-                s_val = s_tx["ValorSistema"]
-                s_banco = s_tx["ContaBancariaSistema"].upper()
-                
-                # Procura correspondentes no PDF
-                matching_pdfs = []
-                for p_tx in pdf_transacoes:
-                    p_date_str = p_tx["Data"]
-                    p_val = p_tx["Valor"]
-                    p_acc = p_tx["Conta"].upper()
-                    
-                    # Checa data e valor
-                    date_match = (p_date_str == s_date_str)
-                    value_match = (abs(p_val - s_val) < 0.01)
-                    
-                    # Checa conta bancaria (se houver mais de uma)
-                    acc_match = True
-                    if enforce_account:
-                        # O numero da conta no PDF (ex: '0609154107') deve estar contido na string de banco do sistema (ex: 'BANRISUL 0609154107')
-                        acc_match = (p_acc in s_banco)
-                        
-                    if date_match and value_match and acc_match:
-                        matching_pdfs.append(p_tx)
-                
-                # Se houver match
-                if matching_pdfs:
-                    # Concatena todas as descrições dos registros PDF correspondentes separando por |
-                    descriptions = [x["Descrição"] for x in matching_pdfs]
-                    s_tx["DescriçõesPDF"] = " | ".join(sorted(list(set(descriptions))))
-                    matched_count += 1
-                else:
-                    s_tx["DescriçõesPDF"] = "❌ NÃO ENCONTRADO NO EXTRATO PDF"
-                    unmatched_count += 1
-                    
-                tabela_conciliada.append({
-                    "Posto": s_tx["Posto"],
-                    "dataSistema": s_tx["dataSistema"],
-                    "CategoriaSistema": s_tx["CategoriaSistema"],
-                    "ValorSistema": s_tx["ValorSistema"],
-                    "ContaBancariaSistema": s_tx["ContaBancariaSistema"],
-                    "DescriçõesPDF": s_tx["DescriçõesPDF"]
-                })
+            descricoes_pdf = conciliar(lancamentos_sistema, pdf_transacoes, enforce_account)
+            matched_count = sum(d is not None for d in descricoes_pdf)
+            unmatched_count = len(descricoes_pdf) - matched_count
 
             # Exibe os resultados
-            if not tabela_conciliada:
+            if not len(lancamentos_sistema):
                 st.warning("Nenhum lançamento no Sistema MR corresponde às regras de filtro para o período selecionado.")
             else:
-                df_resultado = pd.DataFrame(tabela_conciliada)
+                df_sistema = lancamentos_sistema.para_dataframe()
+                df_resultado = pd.DataFrame({
+                    "Posto": empresa_nome,
+                    "dataSistema": df_sistema["Data"].dt.strftime("%d/%m/%Y"),
+                    "CategoriaSistema": CATEGORIA_CONCILIADA,
+                    "ValorSistema": df_sistema["Valor"],
+                    "ContaBancariaSistema": df_sistema["Conta"],
+                    "DescriçõesPDF": [d if d is not None else "❌ NÃO ENCONTRADO NO EXTRATO PDF" for d in descricoes_pdf],
+                })
                 
                 # Métricas de Conciliação (Inline e Minimalista)
                 total_tx = len(df_resultado)
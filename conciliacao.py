@@ -0,0 +1,103 @@
+import sys
+from array import array
+from datetime import date
+
+# Lançamentos da conciliação bancária guardados em colunas compactas, em vez de uma lista de dicts
+# (um dict por lançamento, com seus floats e strings de data, ocupa ~280 bytes; aqui ~28 bytes + textos únicos)
+# - data: dia ordinal (date.toordinal) em array de int32; 0 quando a data não foi identificada no extrato
+# - valor: centavos inteiros em array de int64 (sem erro de arredondamento do float na comparação)
+# - descrição e conta: listas de strings internadas (nomes e contas que se repetem são guardados uma só vez)
+
+DATA_DESCONHECIDA = 0
+# Dia ordinal de 01/01/1970, base do datetime64 do numpy
+ORDINAL_EPOCA = date(1970, 1, 1).toordinal()
+
+
+# Valor em reais (float, int ou str numérica) para centavos inteiros
+def para_centavos(valor) -> int:
+    return int(round(float(valor) * 100))
+
+
+# Data "dd/mm/aaaa" (formato do extrato e da tabela) para dia ordinal; datas inválidas viram DATA_DESCONHECIDA
+def ordinal_da_data(texto) -> int:
+    try:
+        return date(int(texto[6:10]), int(texto[3:5]), int(texto[0:2])).toordinal()
+    except (TypeError, ValueError):
+        return DATA_DESCONHECIDA
+
+
+class Transacoes:
+    __slots__ = ("datas", "centavos", "descricoes", "contas")
+
+    def __init__(self):
+        self.datas = array("i")
+        self.centavos = array("q")
+        self.descricoes = []
+        self.contas = []
+
+    def __len__(self):
+        return len(self.centavos)
+
+    def adicionar(self, data_ordinal, centavos, descricao="", conta=""):
+        self.datas.append(data_ordinal)
+        self.centavos.append(centavos)
+        self.descricoes.append(sys.intern(str(descricao)))
+        self.contas.append(sys.intern(str(conta)))
+
+    # Registros do parsear_extrato_pdf ({"Data": "dd/mm/aaaa", "Descrição": ..., "Valor": float}) de uma conta
+    def adicionar_registros_extrato(self, registros, conta):
+        for registro in registros:
+            self.adicionar(
+                ordinal_da_data(registro["Data"]), para_centavos(registro["Valor"]), registro["Descrição"], conta
+            )
+
+    # DataFrame com as colunas Data, Centavos, Valor, Descrição e Conta
+    # Centavos usa a própria memória do array (sem cópia); Data e Valor são derivados de forma vetorizada
+    # Depois da conversão o array fica preso ao DataFrame e não aceita mais adicionar()
+    def para_dataframe(self):
+        import numpy as np
+        import pandas as pd
+
+        centavos = np.frombuffer(self.centavos, dtype=np.int64)
+        dias = np.frombuffer(self.datas, dtype=np.int32)
+        datas = (dias - ORDINAL_EPOCA).astype("datetime64[D]")
+        datas[dias == DATA_DESCONHECIDA] = np.datetime64("NaT")
+        return pd.DataFrame(
+            {
+                "Data": datas,
+                "Centavos": centavos,
+                "Valor": centavos / 100,
+                "Descrição": self.descricoes,
+                "Conta": self.contas,
+            },
+            copy=False,
+        )
+
+
+# Cruza cada lançamento do sistema com os do extrato de mesma data e mesmo valor (em centavos)
+# Com exigir_conta, a conta do extrato (ex: '0609154107') deve estar contida na conta do sistema
+# (ex: 'BANRISUL 0609154107')
+# Retorna, para cada lançamento do sistema, as descrições encontradas no extrato (sem repetição, em ordem
+# alfabética, separadas por " | ") ou None quando não há correspondente
+def conciliar(sistema, extrato, exigir_conta=False):
+    # Índice do extrato por (dia, centavos): cada lançamento do sistema só olha os candidatos exatos
+    indice = {}
+    for posicao, chave in enumerate(zip(extrato.datas, extrato.centavos)):
+        indice.setdefault(chave, []).append(posicao)
+
+    contas_maiusculas = {}
+    resultado = []
+    for data, centavos, conta_sistema in zip(sistema.datas, sistema.centavos, sistema.contas):
+        candidatos = indice.get((data, centavos))
+        if not candidatos or data == DATA_DESCONHECIDA:
+            resultado.append(None)
+            continue
+        if exigir_conta:
+            conta_sistema = conta_sistema.upper()
+            candidatos = [
+                p for p in candidatos
+                if contas_maiusculas.setdefault(extrato.contas[p], extrato.contas[p].upper()) in conta_sistema
+            ]
+        descricoes = {extrato.descricoes[p] for p in candidatos}
+        resultado.append(" | ".join(sorted(descricoes)) if descricoes else None)
+    return resultado
@@ -0,0 +1,83 @@
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+
+# Números por extenso em português (pt-BR), montados a partir de grupos de 0 a 999
+# Segue as mesmas regras do num2words(lang='pt_BR'), usado como referência na validação
+# (a partir dos quatrilhões o num2words confunde "quatrilhões" com "trilhões" ao trocar "e" por vírgula;
+# aqui a regra é aplicada da mesma forma em todas as escalas)
+
+UNIDADES = [
+    "zero", "um", "dois", "três", "quatro", "cinco", "seis", "sete", "oito", "nove",
+    "dez", "onze", "doze", "treze", "catorze", "quinze", "dezesseis", "dezessete", "dezoito", "dezenove",
+]
+DEZENAS = ["", "", "vinte", "trinta", "quarenta", "cinquenta", "sessenta", "setenta", "oitenta", "noventa"]
+CENTENAS = [
+    "", "cento", "duzentos", "trezentos", "quatrocentos", "quinhentos", "seiscentos", "setecentos", "oitocentos",
+    "novecentos",
+]
+# Escala de cada grupo de três dígitos (singular, plural), a partir dos milhares
+ESCALAS = [
+    ("mil", "mil"),
+    ("milhão", "milhões"),
+    ("bilhão", "bilhões"),
+    ("trilhão", "trilhões"),
+    ("quatrilhão", "quatrilhões"),
+]
+LIMITE = 1000 ** (len(ESCALAS) + 1)
+
+
+# Extenso de um grupo de 0 a 999 ("cento e vinte e três"); há só 1000 grupos possíveis
+@lru_cache(maxsize=1000)
+def grupo_por_extenso(n: int) -> str:
+    if n == 100:
+        return "cem"
+    centena, resto = divmod(n, 100)
+    partes = [CENTENAS[centena]] if centena else []
+    if resto >= 20:
+        dezena, unidade = divmod(resto, 10)
+        partes.append(DEZENAS[dezena])
+        if unidade:
+            partes.append(UNIDADES[unidade])
+    elif resto or not centena:
+        partes.append(UNIDADES[resto])
+    return " e ".join(partes)
+
+
+# Extenso de um inteiro não negativo
+# Os grupos são ligados por "e", exceto antes de um grupo que começa pela centena e continua
+# ("mil, duzentos e trinta e quatro", mas "mil e duzentos" e "mil e cem")
+@lru_cache(maxsize=65536)
+def numero_por_extenso(n: int) -> str:
+    if n < 0 or n >= LIMITE:
+        raise ValueError(f"Número fora do intervalo suportado (0 a {LIMITE - 1}): {n}")
+    if n < 1000:
+        return grupo_por_extenso(n)
+
+    partes = []
+    posicao = 0
+    while n:
+        n, grupo = divmod(n, 1000)
+        if grupo:
+            if posicao == 0:
+                partes.append(grupo_por_extenso(grupo))
+            elif posicao == 1:
+                partes.append("mil" if grupo == 1 else f"{grupo_por_extenso(grupo)} mil")
+            else:
+                singular, plural = ESCALAS[posicao - 1]
+                partes.append(f"um {singular}" if grupo == 1 else f"{grupo_por_extenso(grupo)} {plural}")
+        posicao += 1
+
+    # `partes` vai do grupo menor para o maior; monta do fim para o começo
+    resultado = partes[0]
+    for parte in partes[1:]:
+        primeira, _, resto = resultado.partition(" ")
+        separador = "," if primeira.endswith(("ento", "entos")) and "e" in resto else " e"
+        resultado = f"{parte}{separador} {resultado}"
+    return resultado
+
+
+# Converte o valor em Decimal com centavos exatos (floats passam pela representação decimal mais curta)
+def arredondar_centavos(valor) -> Decimal:
+    if isinstance(valor, float):
+        valor = repr(valor)
+    return Decimal(valor).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
@@ -0,0 +1,112 @@
+import math
+
+# Estimativa de tokens (aproximadamente 4 caracteres por token em português)
+CARACTERES_POR_TOKEN = 4
+# Custo aproximado de cada mensagem além do conteúdo (papel e separadores)
+TOKENS_POR_MENSAGEM = 4
+
+# Janela do modelo configurado (llama3-groq-70b-8192) e espaço reservado para a resposta
+CONTEXTO_MODELO = 8192
+RESERVA_RESPOSTA = 1024
+LIMITE_RESUMO = 600  # tokens
+# Ao resumir, libera espaço extra para não precisar resumir de novo a cada pergunta
+OCUPACAO_APOS_RESUMO = 0.75
+
+
+def estimar_tokens(texto):
+    return math.ceil(len(texto) / CARACTERES_POR_TOKEN)
+
+
+def tokens_mensagens(mensagens):
+    return sum(estimar_tokens(m["content"]) + TOKENS_POR_MENSAGEM for m in mensagens)
+
+
+# Resumo sem modelo, usado se a chamada de resumo falhar: guarda o início de cada mensagem
+def resumo_simples(resumo, mensagens, caracteres_por_mensagem=200):
+    linhas = [resumo] if resumo else []
+    for mensagem in mensagens:
+        autor = "Usuário" if mensagem["role"] == "user" else "IA"
+        linhas.append(f"{autor}: {mensagem['content'][:caracteres_por_mensagem]}")
+    return "\n".join(linhas)
+
+
+# Cria uma função de resumo que usa o próprio modelo do chat para incorporar mensagens antigas ao resumo
+def resumidor_com_modelo(client, modelo):
+    def resumir(resumo, mensagens):
+        conversa = "\n".join(
+            f"{'Usuário' if m['role'] == 'user' else 'IA'}: {m['content']}" for m in mensagens
+        )
+        chat_completion = client.chat.completions.create(
+            messages=[
+                {"role": "system", "content": (
+                    "Resuma a conversa de forma concisa, em português, preservando fatos, preferências, "
+                    "decisões e categorias já definidas. Responda apenas com o resumo atualizado."
+                )},
+                {"role": "user", "content": f"Resumo atual:\n{resumo or '(vazio)'}\n\nNovas mensagens:\n{conversa}"},
+            ],
+            model=modelo,
+            max_tokens=LIMITE_RESUMO,
+        )
+        return chat_completion.choices[0].message.content
+    return resumir
+
+
+# Histórico da conversa com orçamento de tokens: as mensagens recentes vão na íntegra
+# e as mais antigas são incorporadas a um resumo que acompanha o prompt do sistema
+class GerenciadorHistorico:
+    def __init__(self, mensagens=None, resumir=None, orcamento_tokens=CONTEXTO_MODELO - RESERVA_RESPOSTA,
+                 limite_resumo=LIMITE_RESUMO, mensagens_minimas=2):
+        self.mensagens = [] if mensagens is None else mensagens  # histórico completo, para exibição
+        self.resumir = resumir
+        self.orcamento_tokens = orcamento_tokens
+        self.limite_resumo = limite_resumo
+        self.mensagens_minimas = mensagens_minimas
+        self.resumo = ""
+        self.inicio_integral = 0  # mensagens antes desta posição já estão no resumo
+        self.ultimo_envio = None
+
+    def adicionar(self, role, content):
+        self.mensagens.append({"role": role, "content": content})
+
+    # Incorpora mensagens ao resumo, limitando o tamanho do resumo ao `limite_resumo`
+    def _resumir(self, mensagens):
+        try:
+            if self.resumir is None:
+                raise RuntimeError("sem função de resumo")
+            resumo = self.resumir(self.resumo, mensagens)
+        except Exception:
+            resumo = resumo_simples(self.resumo, mensagens)
+        limite_caracteres = self.limite_resumo * CARACTERES_POR_TOKEN
+        return resumo if len(resumo) <= limite_caracteres else resumo[-limite_caracteres:]
+
+    # Monta as mensagens de uma requisição dentro do orçamento de tokens
+    def montar_mensagens(self, prompt_sistema):
+        recentes = self.mensagens[self.inicio_integral:]
+
+        # Quantas mensagens antigas precisam sair para o restante caber no orçamento (com espaço para o resumo)
+        disponivel = self.orcamento_tokens - estimar_tokens(prompt_sistema) - self.limite_resumo
+        custos = [estimar_tokens(m["content"]) + TOKENS_POR_MENSAGEM for m in recentes]
+        total = sum(custos)
+        remover = 0
+        if total > disponivel:
+            disponivel *= OCUPACAO_APOS_RESUMO
+        while total > disponivel and len(recentes) - remover > self.mensagens_minimas:
+            total -= custos[remover]
+            remover += 1
+
+        if remover:
+            self.resumo = self._resumir(recentes[:remover])
+            self.inicio_integral += remover
+            recentes = recentes[remover:]
+
+        conteudo_sistema = prompt_sistema
+        if self.resumo:
+            conteudo_sistema = f"{prompt_sistema}\n\nResumo da conversa anterior:\n{self.resumo}"
+        mensagens = [{"role": "system", "content": conteudo_sistema}, *recentes]
+
+        self.ultimo_envio = {
+            "tokens_estimados": tokens_mensagens(mensagens),
+            "mensagens_integrais": len(recentes),
+            "mensagens_resumidas": self.inicio_integral,
+        }
+        return mensagens
@@ -0,0 +1,85 @@
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+
+
+# Remove acentos e deixa em minúsculas ("Manutenção" -> "manutencao")
+def dobrar_acentos(texto):
+    decomposto = unicodedata.normalize("NFKD", str(texto))
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+# Termos de um texto: palavras inteiras e n-gramas de caracteres de cada palavra (tolera erros e abreviações)
+def extrair_termos(texto, n_min=3, n_max=4):
+    termos = []
+    for palavra in re.findall(r"\w+", dobrar_acentos(texto)):
+        termos.append(palavra)
+        marcada = f" {palavra} "
+        for n in range(n_min, n_max + 1):
+            termos.extend(marcada[i:i + n] for i in range(len(marcada) - n + 1))
+    return termos
+
+
+# Índice TF-IDF local sobre as contas do plano (Categoria, Descrição e DRE)
+class IndiceContas:
+    def __init__(self, plano, n_min=3, n_max=4):
+        self.n_min, self.n_max = n_min, n_max
+        self.contas = [
+            (categoria, descricao, dre)
+            for categoria, contas in plano.items()
+            for descricao, dre in contas
+        ]
+
+        frequencias = [
+            Counter(extrair_termos(f"{categoria} {descricao} {dre}", n_min, n_max))
+            for categoria, descricao, dre in self.contas
+        ]
+        documentos_por_termo = Counter(termo for freq in frequencias for termo in freq)
+        total = len(self.contas)
+        self.idf = {
+            termo: math.log((1 + total) / (1 + qtd)) + 1
+            for termo, qtd in documentos_por_termo.items()
+        }
+
+        # Índice invertido: termo -> [(posição da conta, peso normalizado)]
+        self.postings = {}
+        for posicao, freq in enumerate(frequencias):
+            pesos = {termo: (1 + math.log(qtd)) * self.idf[termo] for termo, qtd in freq.items()}
+            norma = math.sqrt(sum(p * p for p in pesos.values())) or 1.0
+            for termo, peso in pesos.items():
+                self.postings.setdefault(termo, []).append((posicao, peso / norma))
+
+    def __len__(self):
+        return len(self.contas)
+
+    # Posições das `k` contas mais parecidas com a consulta, com a pontuação de cada uma
+    def _melhores_posicoes(self, consulta, k):
+        freq = Counter(t for t in extrair_termos(consulta, self.n_min, self.n_max) if t in self.idf)
+        pesos = {termo: (1 + math.log(qtd)) * self.idf[termo] for termo, qtd in freq.items()}
+        norma = math.sqrt(sum(p * p for p in pesos.values())) or 1.0
+
+        pontuacoes = {}
+        for termo, peso in pesos.items():
+            for posicao, peso_conta in self.postings[termo]:
+                pontuacoes[posicao] = pontuacoes.get(posicao, 0.0) + peso * peso_conta / norma
+
+        return heapq.nlargest(k, pontuacoes.items(), key=lambda item: item[1])
+
+    # Retorna as `k` contas mais parecidas com a consulta, como (pontuação, categoria, descrição, dre)
+    def buscar(self, consulta, k=20):
+        return [(pontuacao, *self.contas[posicao]) for posicao, pontuacao in self._melhores_posicoes(consulta, k)]
+
+    # Subconjunto do plano com as `k` contas mais relevantes, no formato aceito por formatar_plano_de_contas
+    # Sem nenhuma correspondência, usa as primeiras contas do plano
+    def subplano(self, consulta, k=20):
+        posicoes = [posicao for posicao, _ in self._melhores_posicoes(consulta, k)]
+        if not posicoes:
+            posicoes = range(min(k, len(self.contas)))
+
+        plano = {}
+        for posicao in sorted(posicoes):
+            categoria, descricao, dre = self.contas[posicao]
+            plano.setdefault(categoria, []).append((descricao, dre))
+        return plano
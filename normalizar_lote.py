@@ -0,0 +1,140 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from appexcel import (
+    ETAPAS_NORMALIZACAO, ETAPAS_PADRAO, formato_do_arquivo, gerar_excel_para_download, normalizar_em_blocos,
+    normalizar_excel,
+)
+
+SUFIXO_CONVERTIDO = "_convertido"
+
+
+# Lista os arquivos de entrada (.xlsx, .csv, .parquet), ignorando saídas e arquivos temporários do Excel
+def listar_arquivos(entrada, recursivo=False):
+    entrada = Path(entrada)
+    if entrada.is_file():
+        return [entrada]
+    padrao = "**/*" if recursivo else "*"
+    return sorted(
+        p for p in entrada.glob(padrao)
+        if p.is_file() and formato_do_arquivo(p.name)
+        and not p.name.startswith("~$") and not p.stem.endswith(SUFIXO_CONVERTIDO)
+    )
+
+
+# Caminho de saída com o mesmo nome usado no download do Streamlit ("<nome>_convertido.xlsx")
+# CSV e Parquet são normalizados em blocos e gravados como CSV
+# Com pasta de saída, a estrutura de subpastas da entrada é repetida dentro dela
+# (a/x.csv e b/x.csv não podem ir para o mesmo arquivo)
+def caminho_saida(arquivo, pasta_saida=None, raiz=None):
+    if pasta_saida:
+        pasta = Path(pasta_saida)
+        if raiz is not None and Path(raiz).is_dir():
+            pasta = pasta / arquivo.parent.relative_to(raiz)
+    else:
+        pasta = arquivo.parent
+    extensao = ".xlsx" if formato_do_arquivo(arquivo.name) == "xlsx" else ".csv"
+    return pasta / f"{arquivo.stem}{SUFIXO_CONVERTIDO}{extensao}"
+
+
+# Verifica se a saída já existe e é mais nova que a entrada
+def saida_atualizada(arquivo, saida):
+    return saida.exists() and saida.stat().st_mtime >= arquivo.stat().st_mtime
+
+
+# Normaliza um arquivo (executa no processo trabalhador)
+def normalizar_arquivo(arquivo, saida, etapas):
+    inicio = time.perf_counter()
+
+    # Grava em arquivo temporário e renomeia, para não deixar saída pela metade
+    # (o temporário é apagado se a normalização falhar)
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    temporario = saida.with_name(saida.name + ".tmp")
+
+    formato = formato_do_arquivo(arquivo.name)
+    try:
+        if formato == "xlsx":
+            df = normalizar_excel(arquivo, etapas)
+            temporario.write_bytes(gerar_excel_para_download(df))
+            linhas = len(df)
+        else:
+            with open(temporario, "w", encoding="utf-8-sig", newline="") as destino:
+                linhas = normalizar_em_blocos(arquivo, formato, destino, etapas)
+        os.replace(temporario, saida)
+    finally:
+        temporario.unlink(missing_ok=True)
+
+    return {
+        "arquivo": str(arquivo),
+        "linhas": linhas,
+        "bytes": arquivo.stat().st_size,
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Normaliza em lote arquivos Excel, CSV e Parquet de um diretório.")
+    parser.add_argument("entrada", help="Arquivo (.xlsx, .csv, .parquet) ou diretório com esses arquivos")
+    parser.add_argument("-o", "--saida", help="Diretório de saída (padrão: o mesmo do arquivo de entrada)")
+    parser.add_argument("-p", "--processos", type=int, default=os.cpu_count(), help="Número de processos trabalhadores")
+    parser.add_argument("-r", "--recursivo", action="store_true", help="Procurar arquivos também em subdiretórios")
+    parser.add_argument("-f", "--forcar", action="store_true", help="Normalizar mesmo se a saída já estiver atualizada")
+    parser.add_argument("--etapas", nargs="+", choices=list(ETAPAS_NORMALIZACAO), default=ETAPAS_PADRAO,
+                        help="Etapas de normalização a aplicar")
+    args = parser.parse_args(argv)
+
+    arquivos = listar_arquivos(args.entrada, args.recursivo)
+    pendentes = []
+    origem_da_saida = {}
+    falhas = 0
+    for arquivo in arquivos:
+        saida = caminho_saida(arquivo, args.saida, args.entrada)
+        # x.csv e x.parquet da mesma pasta geram o mesmo x_convertido.csv: só o primeiro é normalizado
+        if saida in origem_da_saida:
+            falhas += 1
+            print(f"[erro] {arquivo}: mesma saída que {origem_da_saida[saida]} ({saida})", file=sys.stderr)
+            continue
+        origem_da_saida[saida] = arquivo
+        if not args.forcar and saida_atualizada(arquivo, saida):
+            print(f"[ignorado] {arquivo} (saída já atualizada)")
+            continue
+        pendentes.append((arquivo, saida))
+
+    if not pendentes:
+        print("Nenhum arquivo para normalizar.")
+        return 1 if falhas else 0
+
+    inicio = time.perf_counter()
+    normalizados = total_linhas = total_bytes = 0
+    with ProcessPoolExecutor(max_workers=args.processos) as executor:
+        futuros = {
+            executor.submit(normalizar_arquivo, arquivo, saida, args.etapas): arquivo
+            for arquivo, saida in pendentes
+        }
+        for futuro in as_completed(futuros):
+            arquivo = futuros[futuro]
+            try:
+                resultado = futuro.result()
+            except Exception as erro:
+                falhas += 1
+                print(f"[erro] {arquivo}: {erro}", file=sys.stderr)
+                continue
+            normalizados += 1
+            total_linhas += resultado["linhas"]
+            total_bytes += resultado["bytes"]
+            print(f"[ok] {arquivo}: {resultado['linhas']} linhas em {resultado['segundos']:.2f}s")
+
+    decorrido = time.perf_counter() - inicio
+    print(
+        f"{normalizados} arquivo(s), {total_linhas} linhas em {decorrido:.2f}s | "
+        f"{total_linhas / decorrido:,.0f} linhas/s | {total_bytes / decorrido / 1024 ** 2:.2f} MB/s"
+    )
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
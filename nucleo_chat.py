@@ -0,0 +1,294 @@
+import os
+import random
+import time
+from types import SimpleNamespace
+
+import streamlit as st
+
+from historico_chat import GerenciadorHistorico, estimar_tokens, resumidor_com_modelo, tokens_mensagens
+
+# Modelo usado pelos chats
+MODELO = "llama3-groq-70b-8192-tool-use-preview"
+
+# Estilo dos balões de mensagem do chat
+ESTILO_USUARIO = "text-align: right; background-color: #e1ffc7; padding: 5px; border-radius: 10px; margin: 2px 0; display: inline-block; max-width: 70%; color: black;"
+ESTILO_IA = "text-align: left; background-color: #d4d4d4; padding: 5px; border-radius: 10px; margin: 2px 0; display: inline-block; max-width: 70%; color: black;"
+
+# Intervalo mínimo entre redesenhos da resposta durante a transmissão
+INTERVALO_ATUALIZACAO = 0.05  # segundos
+
+# Mensagens do histórico desenhadas sempre; as anteriores são mostradas por página, sob demanda
+MENSAGENS_VISIVEIS = 30
+
+# Novas tentativas quando a requisição falha antes do primeiro token
+TENTATIVAS = 3
+ESPERA_ENTRE_TENTATIVAS = 1.0  # segundos, dobrando a cada tentativa
+
+
+class ErroProvedorFalso(RuntimeError):
+    pass
+
+
+# Provedor local que imita a API de chat (client.chat.completions.create), sem rede:
+# permite medir latência, novas tentativas e contagem de tokens sem usar a API real
+class ProvedorFalso:
+    def __init__(self, latencia_primeiro_token=0.3, latencia_por_token=0.02, taxa_falha=0.0, responder=None,
+                 semente=None):
+        self.latencia_primeiro_token = latencia_primeiro_token
+        self.latencia_por_token = latencia_por_token
+        self.taxa_falha = taxa_falha
+        self.responder = responder
+        self.chamadas = 0
+        self.falhas = 0
+        self._aleatorio = random.Random(semente)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._criar))
+
+    def _criar(self, messages, model, stream=False, **parametros):
+        self.chamadas += 1
+        if self._aleatorio.random() < self.taxa_falha:
+            self.falhas += 1
+            raise ErroProvedorFalso("falha simulada do provedor")
+
+        if self.responder:
+            resposta = self.responder(messages)
+        else:
+            resposta = f"Resposta simulada para: {messages[-1]['content'][:200]}"
+        pedacos = [p + " " for p in resposta.split(" ")]
+        pedacos[-1] = pedacos[-1].rstrip()
+        uso = SimpleNamespace(prompt_tokens=tokens_mensagens(messages), completion_tokens=estimar_tokens(resposta))
+
+        if not stream:
+            time.sleep(self.latencia_primeiro_token + self.latencia_por_token * len(pedacos))
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=resposta))], usage=uso)
+        return self._transmitir(pedacos, uso)
+
+    def _transmitir(self, pedacos, uso):
+        time.sleep(self.latencia_primeiro_token)
+        for pedaco in pedacos:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=pedaco))], usage=None)
+            time.sleep(self.latencia_por_token)
+        yield SimpleNamespace(choices=[], usage=uso)
+
+
+# Cria o cliente do provedor configurado em CHAT_PROVEDOR ("groq" ou "falso")
+def criar_cliente(provedor=None):
+    provedor = provedor or os.environ.get("CHAT_PROVEDOR", "groq")
+    if provedor == "falso":
+        return ProvedorFalso()
+    from groq import Groq
+    return Groq()  # O cliente pegará automaticamente a chave de API
+
+
+# Cliente criado na primeira utilização e compartilhado por todas as sessões e reruns do processo,
+# reaproveitando o mesmo pool de conexões HTTP
+@st.cache_resource(show_spinner=False)
+def obter_cliente(provedor=None):
+    return criar_cliente(provedor)
+
+
+# Referência ao cliente que só o cria (e só importa o SDK do provedor) na primeira chamada ao modelo,
+# para a página ser desenhada sem esperar por ele
+class ClienteSobDemanda:
+    def __init__(self, provedor=None):
+        self.provedor = provedor
+        self._cliente = None
+
+    @property
+    def chat(self):
+        if self._cliente is None:
+            self._cliente = obter_cliente(self.provedor)
+        return self._cliente.chat
+
+
+# HTML de uma mensagem do chat no formato de balão
+def html_mensagem(role, content):
+    if role == "user":
+        return f"<div style='{ESTILO_USUARIO}'><b>Você:</b> {content}</div>"
+    return f"<div style='{ESTILO_IA}'><b>IA:</b> {content}</div>"
+
+
+# Desenha cada mensagem em seu próprio bloco (um bloco de código ou tag sem fechamento numa resposta
+# não quebra as mensagens seguintes)
+def renderizar_mensagens(mensagens):
+    for mensagem in mensagens:
+        st.markdown(html_mensagem(mensagem["role"], mensagem["content"]), unsafe_allow_html=True)
+
+
+# Desenha só as mensagens mais recentes; as anteriores ficam em páginas que só são desenhadas
+# quando o usuário pede
+def renderizar_historico(historico, visiveis=MENSAGENS_VISIVEIS, chave="historico"):
+    anteriores = len(historico) - visiveis
+    if anteriores > 0 and st.toggle(f"Mostrar mensagens anteriores ({anteriores})", key=f"{chave}_anteriores"):
+        paginas = (anteriores + visiveis - 1) // visiveis
+        pagina = st.number_input("Página", min_value=1, max_value=paginas, value=paginas, key=f"{chave}_pagina")
+        inicio = (pagina - 1) * visiveis
+        renderizar_mensagens(historico[inicio:min(inicio + visiveis, anteriores)])
+    renderizar_mensagens(historico[max(anteriores, 0):])
+
+
+# Uso de tokens informado no último pedaço da transmissão (Groq usa `x_groq.usage`)
+def _uso_do_pedaco(pedaco):
+    uso = getattr(pedaco, "usage", None)
+    if uso is None:
+        uso = getattr(getattr(pedaco, "x_groq", None), "usage", None)
+    return uso
+
+
+# Função para pedir a resposta em modo de transmissão (stream), entregando o texto parcial a `ao_receber`
+# Falhas antes do primeiro token são repetidas até `tentativas` vezes, com espera crescente
+# Retorna a resposta completa e as métricas de latência (tempo até o primeiro token e total) e de tokens
+def transmitir_resposta(client, modelo, mensagens, ao_receber=None, intervalo_atualizacao=INTERVALO_ATUALIZACAO,
+                        tentativas=TENTATIVAS, espera=ESPERA_ENTRE_TENTATIVAS, **parametros):
+    inicio = time.perf_counter()
+    primeiro_token = None
+    ultima_atualizacao = 0.0
+    partes = []
+    uso = None
+
+    for tentativa in range(1, tentativas + 1):
+        try:
+            for pedaco in client.chat.completions.create(messages=mensagens, model=modelo, stream=True, **parametros):
+                uso = _uso_do_pedaco(pedaco) or uso
+                if not pedaco.choices:
+                    continue
+                conteudo = pedaco.choices[0].delta.content
+                if not conteudo:
+                    continue
+                agora = time.perf_counter()
+                if primeiro_token is None:
+                    primeiro_token = agora - inicio
+                partes.append(conteudo)
+                if ao_receber and agora - ultima_atualizacao >= intervalo_atualizacao:
+                    ao_receber("".join(partes))
+                    ultima_atualizacao = agora
+            break
+        except Exception:
+            # Depois que o texto começou a aparecer, repetir duplicaria a resposta
+            if partes or tentativa == tentativas:
+                raise
+            time.sleep(espera * 2 ** (tentativa - 1))
+
+    resposta = "".join(partes)
+    metricas = {
+        "primeiro_token_s": primeiro_token,
+        "total_s": time.perf_counter() - inicio,
+        "tentativas": tentativa,
+        "entrada": getattr(uso, "prompt_tokens", None),
+        "saida": getattr(uso, "completion_tokens", None),
+    }
+    return resposta, metricas
+
+
+# Inicializar o histórico e outros estados de sessão, se necessário
+# Cada chat guarda seu estado em `st.session_state[chave]`, para os chats não se misturarem no app de várias páginas
+def inicializar_sessao(client, modelo=MODELO, chave="chat"):
+    if chave not in st.session_state:
+        historico = []
+        st.session_state[chave] = SimpleNamespace(
+            historico=historico,
+            # Mantém as mensagens recentes na íntegra e resume as antigas para caber na janela do modelo
+            gerenciador_historico=GerenciadorHistorico(historico, resumir=resumidor_com_modelo(client, modelo)),
+            uso_tokens=None,
+            input='',
+            ultima_resposta='',
+        )
+    return st.session_state[chave]
+
+
+# Função para enviar a pergunta e receber a resposta
+# `prompt_sistema(pergunta)` fornece o prompt do sistema de cada app para a pergunta
+# A resposta é transmitida aos poucos e desenhada em `area` (um st.empty()) enquanto chega
+def send_question(question, prompt_sistema, client, modelo=MODELO, area=None, chave="chat"):
+    estado = st.session_state[chave]
+    gerenciador = estado.gerenciador_historico
+
+    # Adicionar a pergunta do usuário ao histórico
+    gerenciador.adicionar("user", question)
+
+    try:
+        # Criar uma mensagem de contexto com o prompt do sistema,
+        # seguida do histórico recente (as mensagens antigas entram resumidas)
+        prompt_pergunta = prompt_sistema(question)
+        mensagens = gerenciador.montar_mensagens(prompt_pergunta)
+
+        # Chamar a API da IA com o histórico e contexto personalizado, em modo de transmissão
+        ao_receber = None
+        if area is not None:
+            ao_receber = lambda parcial: area.markdown(html_mensagem("assistant", parcial + " ▌"),
+                                                       unsafe_allow_html=True)
+        resposta, metricas = transmitir_resposta(client, modelo, mensagens, ao_receber)
+    except BaseException:
+        # Falha ou rerun no meio da transmissão: a pergunta sem resposta sai do histórico
+        # (BaseException inclui a interrupção do Streamlit ao reiniciar o script)
+        gerenciador.mensagens.pop()
+        raise
+    if area is not None:
+        area.markdown(html_mensagem("assistant", resposta), unsafe_allow_html=True)
+
+    # Armazenar a resposta no histórico e em `ultima_resposta`
+    gerenciador.adicionar("assistant", resposta)
+    estado.ultima_resposta = resposta  # Armazena a última resposta para exibição direta
+
+    # Registrar o tamanho e a latência da requisição e quanto dela é o prompt do sistema
+    estado.uso_tokens = {
+        "prompt_sistema": estimar_tokens(prompt_pergunta),
+        "estimados": gerenciador.ultimo_envio["tokens_estimados"],
+        "resumidas": gerenciador.ultimo_envio["mensagens_resumidas"],
+        **metricas,
+    }
+
+
+# Desenha a interface do chat (entrada, resposta transmitida, métricas e histórico)
+def executar_chat(prompt_sistema, client, modelo=MODELO, chave="chat"):
+    estado = inicializar_sessao(client, modelo, chave)
+
+    # Campo de entrada e botão de envio
+    col1, col2 = st.columns([4, 1])  # Criar duas colunas: uma para o campo e outra para o botão
+
+    # Campo de entrada
+    with col1:
+        pergunta = st.text_input("Digite sua pergunta:",
+                                 value=estado.input,
+                                 placeholder="Escreva sua mensagem aqui...",
+                                 label_visibility="collapsed",
+                                 key=f"{chave}_pergunta")
+
+    # Botão de envio
+    with col2:
+        enviar = st.button("Enviar", key=f"{chave}_enviar")
+
+    # Exibir a resposta abaixo da área de entrada: a nova é transmitida enquanto chega
+    if enviar and pergunta:  # Verificar se a pergunta não está vazia
+        st.write("### Resposta da IA")
+        send_question(pergunta, prompt_sistema, client, modelo, st.empty(), chave)  # Obter a resposta da IA
+        estado.input = ""  # Limpa o campo de entrada após enviar
+    elif estado.ultima_resposta:
+        st.write("### Resposta da IA")
+        st.markdown(html_mensagem("assistant", estado.ultima_resposta), unsafe_allow_html=True)
+
+    uso_tokens = estado.uso_tokens
+    if estado.ultima_resposta and uso_tokens:
+        entrada = uso_tokens["entrada"] or uso_tokens["estimados"]
+        st.caption(
+            f"Tokens de entrada: {entrada} (estimados: {uso_tokens['estimados']}; prompt do sistema: "
+            f"~{uso_tokens['prompt_sistema']}, {uso_tokens['prompt_sistema'] / entrada:.0%}) | "
+            f"tokens de saída: {uso_tokens['saida']} | mensagens antigas resumidas: {uso_tokens['resumidas']} | "
+            f"primeiro token: {uso_tokens['primeiro_token_s'] or 0:.2f}s | total: {uso_tokens['total_s']:.2f}s"
+        )
+
+    # Exibir o histórico de conversas completo abaixo da última resposta
+    st.write("### Histórico Completo de Conversas")
+    renderizar_historico(estado.historico, chave=f"{chave}_historico")
+
+    # Adiciona estilo opcional para melhorar a interface
+    st.markdown("""
+<style>
+body {
+    background-color: #f0f0f0;  /* Fundo claro para dar um aspecto moderno */
+}
+div {
+    padding: 5px;  /* Reduz o espaço entre as mensagens */
+    border-radius: 10px;
+}
+</style>
+""", unsafe_allow_html=True)
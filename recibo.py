@@ -0,0 +1,325 @@
+import io
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+from extenso import arredondar_centavos, numero_por_extenso
+
+PASTA_RECURSOS = Path(__file__).parent
+ARQUIVO_LOGO = PASTA_RECURSOS / "logo.png"
+ARQUIVO_FONTE = PASTA_RECURSOS / "DejaVuSans.ttf"
+
+# Layout do recibo
+LARGURA, ALTURA = 800, 350
+LADO_LOGO = 80
+MARGEM = 20
+TAMANHO_TITULO, TAMANHO_TEXTO = 32, 20
+ALTURA_LINHA = 25
+ASSINATURA_W, ASSINATURA_H = 300, 100
+
+MESES_PT = [
+    "janeiro", "fevereiro", "março", "abril", "maio", "junho",
+    "julho", "agosto", "setembro", "outubro", "novembro", "dezembro"
+]
+
+
+# Medidas de uma palavra na fonte, guardadas por (fonte, palavra): avanço (onde começa o que vem depois)
+# e borda direita do desenho (o que draw.textbbox mede no fim da linha)
+@lru_cache(maxsize=65536)
+def medir_palavra(font: ImageFont.FreeTypeFont, palavra: str) -> tuple[float, float]:
+    return font.getlength(palavra), font.getbbox(palavra)[2]
+
+
+# Função para quebrar texto em várias linhas conforme largura máxima
+# A largura de cada linha é a soma acumulada das medidas das palavras (sem medir a linha inteira a cada palavra)
+def wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int,
+              draw: ImageDraw.ImageDraw | None = None) -> list[str]:
+    espaco = medir_palavra(font, " ")[0]
+    lines = []
+    current = []
+    inicio = 0.0  # posição onde começa a próxima palavra da linha atual
+    for w in text.split():
+        avanco, direita = medir_palavra(font, w)
+        if current and inicio + espaco + direita <= max_width:
+            current.append(w)
+            inicio += espaco + avanco
+        else:
+            if current:
+                lines.append(" ".join(current))
+            current = [w]
+            inicio = avanco
+    if current:
+        lines.append(" ".join(current))
+    return lines
+
+
+# Valor do cabeçalho, arredondado como no extenso (Decimal, meio para cima) para que os dois sempre coincidam
+def valor_do_cabecalho(valor) -> str:
+    return f"R$ {arredondar_centavos(valor)}"
+
+
+# Valor em reais por extenso, com os centavos calculados em Decimal (sem erro de arredondamento de float)
+def valor_por_extenso(valor) -> str:
+    centavos_totais = int(arredondar_centavos(valor) * 100)
+    sinal = "menos " if centavos_totais < 0 else ""
+    reais, centavos = divmod(abs(centavos_totais), 100)
+    if reais and centavos:
+        return f"{sinal}{numero_por_extenso(reais)} reais e {numero_por_extenso(centavos)} centavos"
+    if reais:
+        return f"{sinal}{numero_por_extenso(reais)} reais"
+    return f"{sinal}{numero_por_extenso(centavos)} centavos"
+
+
+# Data por extenso usada no rodapé ("Porto Alegre, 5 de março de 2025")
+def formatar_data_local(data) -> str:
+    return f"Porto Alegre, {data.day} de {MESES_PT[data.month - 1]} de {data.year}"
+
+
+# Recursos carregados uma única vez por processo (os recibos seguintes reaproveitam a mesma cópia)
+
+# Fonte no tamanho pedido; sem o arquivo .ttf, usa a fonte padrão do Pillow
+@lru_cache(maxsize=None)
+def carregar_fonte(tamanho: int) -> ImageFont.ImageFont:
+    try:
+        return ImageFont.truetype(str(ARQUIVO_FONTE), tamanho)
+    except IOError:
+        return ImageFont.load_default()
+
+
+# Logo já redimensionado e sua máscara de transparência; None se o logo não existir ou não abrir
+@lru_cache(maxsize=None)
+def carregar_logo(lado: int = LADO_LOGO):
+    if not ARQUIVO_LOGO.exists():
+        return None
+    try:
+        logo = Image.open(ARQUIVO_LOGO)
+        try:
+            logo = logo.resize((lado, lado), Image.Resampling.LANCZOS)
+        except AttributeError:
+            logo = logo.resize((lado, lado), Image.ANTIALIAS)
+        mask_logo = logo.split()[3] if logo.mode in ("RGBA", "LA") else None
+    except Exception:
+        return None
+    return logo, mask_logo
+
+
+# Parte fixa do recibo (logo, título e rótulo da assinatura), desenhada uma única vez
+# Não deve ser alterada: cada recibo trabalha sobre uma cópia
+@lru_cache(maxsize=None)
+def modelo_recibo() -> Image.Image:
+    img = Image.new("RGB", (LARGURA, ALTURA), "white")
+    draw = ImageDraw.Draw(img)
+
+    logo = carregar_logo()
+    logo_w = 0
+    if logo:
+        img.paste(logo[0], (MARGEM, MARGEM), logo[1])
+        logo_w = LADO_LOGO
+
+    draw.text((MARGEM + logo_w + 10, 45), "Recibo", fill="black", font=carregar_fonte(TAMANHO_TITULO))
+    draw.text((MARGEM, ALTURA - 130), "Assinatura:", fill="black", font=carregar_fonte(TAMANHO_TEXTO))
+    return img
+
+
+def gerar_recibo_image(
+    valor: float,
+    valor_ext: str,
+    referente: str,
+    desc: str,
+    data_local: str,
+    assinatura_img: Image.Image
+) -> Image.Image:
+    img = modelo_recibo().copy()
+    draw = ImageDraw.Draw(img)
+    fonte_titulo = carregar_fonte(TAMANHO_TITULO)
+    fonte_texto = carregar_fonte(TAMANHO_TEXTO)
+    logo_h = LADO_LOGO if carregar_logo() else 0
+
+    # Cabeçalho: o título já está no modelo, falta o valor
+    draw.text((LARGURA - 250, 45), valor_do_cabecalho(valor), fill="black", font=fonte_titulo)
+
+    # Corpo inicia abaixo do logo
+    y = MARGEM + logo_h + 20
+    linhas = [
+        f"Recebi de SABOR DE LUNA PADARIA E PASTIFÍCIO a quantia de {valor_ext}; referente a {referente}; {desc}"
+    ]
+    # Quebra as linhas conforme largura
+    max_text_width = LARGURA - 2 * MARGEM
+    for texto in linhas:
+        wrapped = wrap_text(texto, fonte_texto, max_text_width, draw)
+        for line in wrapped:
+            draw.text((MARGEM, y), line, fill="black", font=fonte_texto)
+            y += ALTURA_LINHA
+
+    # Inserir assinatura abaixo do rótulo (já desenhado no modelo)
+    assin = assinatura_img.resize((ASSINATURA_W, ASSINATURA_H))
+    assinatura_y = ALTURA - 130 + 20
+    mask_assin = assin.split()[3] if assin.mode in ("RGBA", "LA") else None
+    img.paste(assin, (MARGEM, assinatura_y), mask_assin)
+
+    # Data alinhada à direita
+    bbox = draw.textbbox((0, 0), data_local, font=fonte_texto)
+    text_w = bbox[2] - bbox[0]
+    text_h = bbox[3] - bbox[1]
+    data_x = LARGURA - text_w - MARGEM
+    data_y = ALTURA - text_h - MARGEM
+    draw.text((data_x, data_y), data_local, fill="black", font=fonte_texto)
+
+    return img
+
+
+# Exportação do recibo para download
+# O recibo tem poucas cores (texto preto, fundo branco e o logo): uma paleta reduzida quase não altera
+# a imagem e deixa o PNG cerca de 4x menor
+CORES_PNG_QUANTIZADO = 64
+FORMATOS_EXPORTACAO = {
+    "png": ("PNG", "image/png"),
+    "png_quantizado": ("PNG otimizado (paleta de cores)", "image/png"),
+    "pdf": ("PDF vetorial", "application/pdf"),
+}
+
+
+# PNG do recibo; com `quantizar`, usa paleta de CORES_PNG_QUANTIZADO cores e compressão otimizada
+def exportar_png(img: Image.Image, quantizar: bool = False) -> bytes:
+    buf = io.BytesIO()
+    if quantizar:
+        img = img.quantize(CORES_PNG_QUANTIZADO, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    img.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+# Verifica se o reportlab (opcional) está instalado para gerar o PDF vetorial
+def pdf_vetorial_disponivel() -> bool:
+    try:
+        import reportlab  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# Imagem com transparência aplicada sobre fundo branco (o PDF recebe só RGB)
+def _sobre_fundo_branco(img: Image.Image) -> Image.Image:
+    if img.mode not in ("RGBA", "LA"):
+        return img.convert("RGB")
+    fundo = Image.new("RGB", img.size, "white")
+    fundo.paste(img, (0, 0), img.split()[-1])
+    return fundo
+
+
+# Recibo em PDF com texto vetorial (nítido em qualquer zoom e impressão), no mesmo layout da imagem
+# Logo e assinatura entram como imagens; a assinatura mantém a resolução original do desenho
+def gerar_recibo_pdf(
+    valor: float,
+    valor_ext: str,
+    referente: str,
+    desc: str,
+    data_local: str,
+    assinatura_img: Image.Image
+) -> bytes:
+    from reportlab.lib.utils import ImageReader, simpleSplit
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfgen import canvas
+
+    fonte = "Helvetica"
+    if ARQUIVO_FONTE.exists():
+        if "DejaVuSans" not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(TTFont("DejaVuSans", str(ARQUIVO_FONTE)))
+        fonte = "DejaVuSans"
+
+    buf = io.BytesIO()
+    pdf = canvas.Canvas(buf, pagesize=(LARGURA, ALTURA))
+
+    # Coordenadas do PDF partem de baixo; `topo` converte a posição do topo do texto na imagem em linha de base
+    def topo(y, tamanho):
+        return ALTURA - y - tamanho * 0.8
+
+    logo = carregar_logo()
+    logo_w = logo_h = 0
+    if logo:
+        logo_w = logo_h = LADO_LOGO
+        pdf.drawImage(ImageReader(_sobre_fundo_branco(logo[0])), MARGEM, ALTURA - MARGEM - logo_h, logo_w, logo_h)
+
+    # Cabeçalho
+    pdf.setFont(fonte, TAMANHO_TITULO)
+    pdf.drawString(MARGEM + logo_w + 10, topo(45, TAMANHO_TITULO), "Recibo")
+    pdf.drawString(LARGURA - 250, topo(45, TAMANHO_TITULO), valor_do_cabecalho(valor))
+
+    # Corpo inicia abaixo do logo, com quebra de linhas pelas medidas da fonte do PDF
+    pdf.setFont(fonte, TAMANHO_TEXTO)
+    y = MARGEM + logo_h + 20
+    texto = f"Recebi de SABOR DE LUNA PADARIA E PASTIFÍCIO a quantia de {valor_ext}; referente a {referente}; {desc}"
+    for line in simpleSplit(texto, fonte, TAMANHO_TEXTO, LARGURA - 2 * MARGEM):
+        pdf.drawString(MARGEM, topo(y, TAMANHO_TEXTO), line)
+        y += ALTURA_LINHA
+
+    # Rodapé: assinatura e data alinhada à direita
+    pdf.drawString(MARGEM, topo(ALTURA - 130, TAMANHO_TEXTO), "Assinatura:")
+    pdf.drawImage(ImageReader(_sobre_fundo_branco(assinatura_img)), MARGEM, 130 - 20 - ASSINATURA_H,
+                  ASSINATURA_W, ASSINATURA_H)
+    pdf.drawRightString(LARGURA - MARGEM, MARGEM, data_local)
+
+    pdf.showPage()
+    pdf.save()
+    return buf.getvalue()
+
+
+# Assinatura do lote, recebida uma única vez por processo trabalhador (em vez de a cada recibo)
+_assinatura_lote = None
+
+
+def _iniciar_trabalhador(assinatura_png: bytes):
+    global _assinatura_lote
+    assinatura = Image.open(io.BytesIO(assinatura_png)).convert("RGBA")
+    _assinatura_lote = assinatura.resize((ASSINATURA_W, ASSINATURA_H))
+
+
+# Gera um recibo do lote (executa no processo trabalhador)
+# Retorna o PNG (para o zip) ou a imagem (para o PDF) e o tempo gasto
+def _gerar_recibo_lote(valor, referente, desc, data, formato):
+    inicio = time.perf_counter()
+    img = gerar_recibo_image(
+        valor, valor_por_extenso(valor), referente, desc, formatar_data_local(data), _assinatura_lote
+    )
+    if formato == "zip":
+        # Sem perdas, como o download individual padrão: o zip não degrada assinatura e texto
+        img = exportar_png(img)
+    return img, time.perf_counter() - inicio
+
+
+# Gera um recibo para cada pagamento (valor, referente, descrição, data) com a mesma assinatura,
+# em paralelo, e retorna um zip de PNGs (formato="zip") ou um PDF com uma página por recibo (formato="pdf")
+# Retorna (arquivo, tempos), com o tempo de geração de cada recibo na ordem dos pagamentos
+def gerar_recibos_em_lote(pagamentos, assinatura_img: Image.Image, formato="zip", processos=None,
+                          ao_progredir=None):
+    buf = io.BytesIO()
+    assinatura_img.save(buf, format="PNG")
+
+    resultados = [None] * len(pagamentos)
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_trabalhador,
+                             initargs=(buf.getvalue(),)) as executor:
+        futuros = {
+            executor.submit(_gerar_recibo_lote, valor, referente, desc, data, formato): posicao
+            for posicao, (valor, referente, desc, data) in enumerate(pagamentos)
+        }
+        # O progresso é informado no processo que chamou a função
+        for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+            resultados[futuros[futuro]] = futuro.result()
+            if ao_progredir:
+                ao_progredir(concluidos, len(pagamentos))
+
+    saida = io.BytesIO()
+    if formato == "pdf":
+        imagens = [img for img, _ in resultados]
+        if imagens:
+            imagens[0].save(saida, format="PDF", save_all=True, append_images=imagens[1:], resolution=100)
+    else:
+        # PNG já é comprimido: os arquivos vão para o zip sem nova compressão
+        with zipfile.ZipFile(saida, "w", zipfile.ZIP_STORED) as zf:
+            for posicao, (png, _) in enumerate(resultados, start=1):
+                zf.writestr(f"recibo_{posicao:04d}.png", png)
+    return saida.getvalue(), [segundos for _, segundos in resultados]
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import streamlit as st
+
+# Recursos compartilhados por todas as páginas, sessões e reruns do processo (criados uma única vez)
+# No app de várias páginas (app.py) cada recurso é pago uma vez por contêiner, e não uma vez por ferramenta
+
+# Pasta dos caches em disco (plano de contas, categorias confirmadas, ...)
+PASTA_CACHE = Path(__file__).parent / ".cache"
+
+# Conexões HTTP mantidas abertas por host
+CONEXOES_POR_HOST = 20
+
+
+# Sessão HTTP com pool de conexões, usada nas chamadas ao Google Sheets, Microsoft Graph e API do Sistema MR
+@st.cache_resource(show_spinner=False)
+def obter_sessao_http():
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    sessao = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=CONEXOES_POR_HOST, pool_maxsize=CONEXOES_POR_HOST)
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+    return sessao
+
+
+# Aplicação MSAL do Microsoft Graph; o próprio MSAL guarda o token e só pede outro quando ele expira
+@st.cache_resource(show_spinner=False)
+def obter_app_msal(tenant_id, client_id, client_secret):
+    import msal
+
+    return msal.ConfidentialClientApplication(
+        client_id,
+        authority=f"https://login.microsoftonline.com/{tenant_id}",
+        client_credential=client_secret,
+        http_client=obter_sessao_http(),
+    )